@@ -6,10 +6,14 @@ Process user's icon to ICO format
 from PIL import Image
 import os
 
+from create_assets import ASSETS_DIR, save_ico
+
+ICON_SOURCE = os.path.join(ASSETS_DIR, "icon_source.png")
+
 def process_user_icon():
     """Convert user's icon to ICO with multiple sizes"""
-    icon_path = "assets/icon_source.png"
-    output_ico = "assets/icon.ico"
+    icon_path = ICON_SOURCE
+    output_ico = os.path.join(ASSETS_DIR, "icon.ico")
     
     if not os.path.exists(icon_path):
         print(f"Icon not found: {icon_path}")
@@ -18,19 +22,12 @@ def process_user_icon():
     # Load image
     img = Image.open(icon_path).convert("RGBA")
     
-    # Create multiple sizes for ICO
-    sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-    icons = []
-    for size in sizes:
-        resized = img.resize(size, Image.Resampling.LANCZOS)
-        icons.append(resized)
-    
-    # Save as ICO
-    icons[0].save(output_ico, format="ICO", sizes=[(icon.width, icon.height) for icon in icons])
+    # Save as ICO (sizes come from a progressive downscale pyramid)
+    save_ico(img, output_ico)
     print(f"User icon saved as: {output_ico}")
     
     # Also save PNG version
-    img.save("assets/icon.png", "PNG")
+    img.save(os.path.join(ASSETS_DIR, "icon.png"), "PNG")
     print("Icon PNG saved")
 
 if __name__ == "__main__":
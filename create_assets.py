@@ -2,62 +2,151 @@
 # -*- coding: utf-8 -*-
 """
 Create Frutiger Aero background assets
+
+Run as the asset pipeline: independent outputs render in parallel, and each is
+skipped when the hash of its inputs matches the last build (--force rebuilds).
 """
 from PIL import Image, ImageDraw
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import hashlib
+import json
 import os
 
+ASSETS_DIR = "assets"
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ASSETS_DIR, ".manifest.json")
+ICO_SIZES = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
+
+def vertical_gradient(size, top, bottom):
+    """Whole-image gradient from `top` to `bottom` RGBA colors (no per-row drawing)"""
+    width, height = size
+    # 0..255 ramp down one column, then one lookup table per channel maps it to the color
+    ramp = Image.linear_gradient("L").resize((1, height), Image.Resampling.BILINEAR)
+    bands = [ramp.point([int(a + (b - a) * v / 255) for v in range(256)])
+             for a, b in zip(top, bottom)]
+    return Image.merge("RGBA", bands).resize((width, height), Image.Resampling.NEAREST)
+
+def icon_pyramid(img, sizes):
+    """
+    Resize `img` to every size, largest first, each from a progressively halved copy:
+    LANCZOS only ever runs on an image at most twice the target instead of full-res.
+    """
+    resized = {}
+    level = img
+    for size in sorted(sizes, reverse=True):
+        while level.width >= size[0] * 4 and level.height >= size[1] * 4:
+            level = level.reduce(2)
+        resized[size] = level.resize(size, Image.Resampling.LANCZOS)
+    return [resized[size] for size in sizes]
+
+def save_ico(img, path, sizes=ICO_SIZES):
+    """Save a multi-size ICO built from the downscale pyramid"""
+    icons = icon_pyramid(img, sizes)
+    # Pillow writes the requested sizes from the largest frame; append the rest as-is
+    icons[-1].save(path, format="ICO", sizes=sizes, append_images=icons[:-1])
+
 def create_frutiger_background():
     """Create a Frutiger Aero style gradient background"""
-    os.makedirs("assets", exist_ok=True)
-    
-    # Create 1920x1080 background
-    width, height = 1920, 1080
-    img = Image.new("RGBA", (width, height))
-    draw = ImageDraw.Draw(img)
-    
-    # Frutiger Aero style gradient (sky blue to white)
-    for y in range(height):
-        ratio = y / height
-        # Sky blue to light blue gradient
-        r = int(135 + (255 - 135) * ratio)
-        g = int(206 + (255 - 206) * ratio)  
-        b = int(250 + (255 - 250) * ratio * 0.5)
-        a = int(255 * 0.7)  # 70% opacity
-        color = (r, g, b, a)
-        draw.line([(0, y), (width, y)], fill=color)
-    
-    img.save("assets/background.png", "PNG")
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+
+    # Frutiger Aero style gradient (sky blue to white), 70% opacity, 1920x1080
+    alpha = int(255 * 0.7)
+    img = vertical_gradient((1920, 1080), (135, 206, 250, alpha), (255, 255, 252, alpha))
+
+    img.save(os.path.join(ASSETS_DIR, "background.png"), "PNG")
     print("Created Frutiger Aero background")
 
 def create_app_icon():
     """Create a simple Pasty icon"""
-    os.makedirs("assets", exist_ok=True)
-    
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+
     # Create 256x256 icon
     size = 256
     img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
-    
+
     # Blue circle with white "P"
     draw.ellipse([10, 10, size-10, size-10], fill=(70, 130, 180, 255))
-    
+
     # Simple "P" (approximation with rectangles)
     # Vertical bar
     draw.rectangle([80, 60, 110, 200], fill=(255, 255, 255, 255))
     # Top arc
     draw.ellipse([100, 60, 180, 140], fill=(255, 255, 255, 255))
     draw.ellipse([115, 75, 165, 125], fill=(70, 130, 180, 255))
-    
+
     # Save as PNG and ICO
-    img.save("assets/icon.png", "PNG")
-    
-    # Create ICO with multiple sizes
-    sizes = [(16, 16), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-    icons = [img.resize(s, Image.Resampling.LANCZOS) for s in sizes]
-    icons[0].save("assets/icon.ico", format="ICO", sizes=[(i.width, i.height) for i in icons])
-    
+    img.save(os.path.join(ASSETS_DIR, "icon.png"), "PNG")
+    save_ico(img, os.path.join(ASSETS_DIR, "icon.ico"))
+
     print("Created app icon")
 
+def inputs_digest(files, *params):
+    """
+    Content hash of the files (missing ones count as absent) and parameters.
+    Files are named relative to the repo, so the digest is the same in every checkout.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for param in params:
+        h.update(repr(param).encode("utf-8") + b"\0")
+    for path in files:
+        name = os.path.relpath(os.path.abspath(path), REPO_DIR).replace(os.sep, "/")
+        h.update(name.encode("utf-8") + b"\0")
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except FileNotFoundError:
+            h.update(b"<missing>")
+        h.update(b"\0")
+    return h.hexdigest()
+
+def asset_tasks():
+    """(name, build function, outputs, input digest) for every asset"""
+    import convert_icon
+
+    scripts = [__file__]
+    tasks = [("background", create_frutiger_background, ["background.png"],
+              inputs_digest(scripts))]
+    if os.path.exists(convert_icon.ICON_SOURCE):
+        # A user-supplied icon replaces the generated one
+        tasks.append(("icon", convert_icon.process_user_icon, ["icon.ico", "icon.png"],
+                      inputs_digest(scripts + [convert_icon.__file__, convert_icon.ICON_SOURCE], ICO_SIZES)))
+    else:
+        tasks.append(("icon", create_app_icon, ["icon.ico", "icon.png"],
+                      inputs_digest(scripts, ICO_SIZES)))
+    return tasks
+
+def build_assets(force=False, jobs=None):
+    """Build stale assets in parallel; returns the names that were rebuilt"""
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    stale = []
+    for name, build, outputs, digest in asset_tasks():
+        present = all(os.path.exists(os.path.join(ASSETS_DIR, out)) for out in outputs)
+        if force or not present or manifest.get(name) != digest:
+            stale.append((name, build, digest))
+        else:
+            print(f"Up to date: {name}")
+
+    # PIL releases the GIL while resampling/encoding, so threads render side by side
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for (name, _, digest), future in zip(stale, [pool.submit(build) for _, build, _ in stale]):
+            future.result()
+            manifest[name] = digest
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return [name for name, _, _ in stale]
+
 if __name__ == "__main__":
-    create_frutiger_background()
-    create_app_icon()
+    parser = argparse.ArgumentParser(description="Build Pasty image assets")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if inputs are unchanged")
+    parser.add_argument("--jobs", type=int, help="Parallel renders (default: automatic)")
+    args = parser.parse_args()
+    build_assets(force=args.force, jobs=args.jobs)
@@ -1,4 +1,3 @@
-
 """
 Pasty (페이스티) - Ghost-typing Utility
 Rheehose (Rhee Creative) 2008-2026
@@ -6,11 +5,31 @@ License: Apache License 2.0
 """
 
 import sys
-from PySide6.QtWidgets import QApplication
-from src.app import PastyApp
+import multiprocessing
+from src.startup import StartupProfiler
 
 if __name__ == "__main__":
+    # Frozen builds: lets the out-of-process injector (INJECT_MODE = "process") spawn its child
+    multiprocessing.freeze_support()
+    # --profile-startup: print import and init timings once the first frame is up
+    profiler = StartupProfiler("--profile-startup" in sys.argv)
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from src.app import PastyApp
+    profiler.mark("imports")
+
     app = QApplication(sys.argv)
+    profiler.mark("QApplication")
     window = PastyApp()
+    profiler.mark("PastyApp built")
     window.show()
+
+    def report():
+        profiler.mark("first event loop tick (READY)")
+        for line in profiler.report():
+            print(line, file=sys.stderr)
+
+    if profiler.enabled:
+        QTimer.singleShot(0, report)
     sys.exit(app.exec())
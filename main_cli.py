@@ -4,23 +4,32 @@ Pasty (페이스티) - CLI Version
 """
 
 import sys
+from src.startup import StartupProfiler
+
+# Created before anything heavy is imported so the profile covers it
+PROFILER = StartupProfiler("--profile-startup" in sys.argv)
+
 import os
 import time
+import select
 import argparse
+from contextlib import contextmanager
 from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.progress import track
-from rich.live import Live
-from rich.layout import Layout
-from rich import print as rprint
 
+# rich.prompt / rich.live / rich.table and pynput are imported where first used
 from src.engine import GhostTyper
-from src.config import APP_NAME, VERSION, STRINGS
+from src.source import load_source
+from src.config import (APP_NAME, VERSION, STRINGS, CLI_REFRESH_FPS, ADAPTIVE_TARGET_RATE,
+                        INJECT_MODE)
 
 console = Console()
 
+# Dashboard controls: Ctrl chords, which the engine never treats as typing
+KEY_TOGGLE = "\x13"  # Ctrl+S
+KEY_QUIT = "\x11"    # Ctrl+Q
+
 def print_header(lang="ko"):
     s = STRINGS[lang]
     grid = Panel.fit(
@@ -31,21 +40,237 @@ def print_header(lang="ko"):
     )
     console.print(grid)
 
+@contextmanager
+def raw_terminal():
+    """cbreak mode on POSIX terminals: keys arrive unbuffered, Ctrl+C still works"""
+    if os.name == "nt" or not sys.stdin.isatty():
+        yield
+        return
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        # Without flow control Ctrl+S/Ctrl+Q reach us instead of pausing the terminal
+        mode = termios.tcgetattr(fd)
+        mode[0] &= ~termios.IXON
+        termios.tcsetattr(fd, termios.TCSANOW, mode)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+def read_key(timeout):
+    """Return one pressed key, or None after `timeout` seconds"""
+    if os.name == "nt":
+        import msvcrt
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if msvcrt.kbhit():
+                return msvcrt.getwch()
+            time.sleep(0.01)
+        return None
+    ready, _, _ = select.select([sys.stdin], [], [], timeout)
+    if not ready:
+        return None
+    data = os.read(sys.stdin.fileno(), 1)
+    return data.decode(errors="ignore") if data else KEY_QUIT[0]
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+def render_dashboard(stats, is_recording, last_error, s):
+    """Build one dashboard frame from engine stats"""
+    from rich.table import Table
+    from rich.progress_bar import ProgressBar
+
+    index, total = stats["content_index"], stats["total_chars"]
+    rate = stats["chars_per_sec"]
+    eta = (total - index) / rate if rate > 0 else None
+    latency = stats["inject_latency"]
+
+    table = Table.grid(padding=(0, 2))
+    table.add_column(style="bold")
+    table.add_column()
+    status = f"[bold red]{s['rec']} {s['pasting']}[/bold red]" if is_recording else f"[bold green]{s['paused']}[/bold green]"
+    table.add_row("", status)
+    table.add_row(s["position"], f"{index:,} / {total:,}  ({index / total * 100 if total else 100:.1f}%)")
+    table.add_row("", ProgressBar(total=max(total, 1), completed=index, width=40))
+    table.add_row(s["eta"], format_eta(eta))
+    table.add_row(s["speed"], f"{rate:,.1f} chars/s  ·  {stats['chunks_per_sec']:,.1f} chunks/s")
+    injector = stats["inject_mode"]
+    if stats.get("injector_restarts"):
+        injector += f" ({stats['injector_restarts']} restarts)"
+    table.add_row(s["latency"], f"p50 {latency['p50_ms']} ms  ·  p99 {latency['p99_ms']} ms  ·  queue {stats['queue_depth']}  ·  {injector}")
+    if "adaptive" in stats:
+        adaptive = stats["adaptive"]
+        table.add_row(s["adaptive"], f"{adaptive['chunk_chars']} chars/press  ·  {adaptive['effective_rate']} / {adaptive['target_rate']} chars/s  ·  scale {adaptive['scale']}")
+    if "autotype_jitter" in stats:
+        jitter = stats["autotype_jitter"]
+        table.add_row(s["jitter"], f"p50 {jitter['p50_ms']} ms  ·  p99 {jitter['p99_ms']} ms  ·  max {jitter['max_ms']} ms")
+    if last_error:
+        table.add_row(s["error"], f"[red]{last_error}[/red]")
+    return Panel(table, title=f"{APP_NAME} {VERSION}", subtitle=s["cli_controls"], border_style="blue")
+
+def run_dashboard(get_stats, set_recording, get_error, s):
+    """Single-key control loop; returns when the user quits"""
+    is_recording = False
+    frame = 1.0 / CLI_REFRESH_FPS
+    next_frame = 0.0
+
+    from rich.live import Live
+    with raw_terminal(), Live(console=console, auto_refresh=False) as live:
+        while True:
+            # Redraw at most CLI_REFRESH_FPS times a second, however fast keys arrive
+            now = time.monotonic()
+            if now >= next_frame:
+                live.update(render_dashboard(get_stats(), is_recording, get_error(), s), refresh=True)
+                next_frame = now + frame
+            key = read_key(max(0.0, next_frame - time.monotonic()))
+            if not key:
+                continue
+            if key in KEY_QUIT:
+                return
+            if key in KEY_TOGGLE:
+                is_recording = not is_recording
+                set_recording(is_recording)
+                next_frame = 0.0
+
+def run_client(args, source_path, target_path, s):
+    """Drive a session in a running pastyd instead of an in-process engine"""
+    from src.daemon import DaemonClient, DaemonError
+
+    try:
+        client = DaemonClient(args.socket)
+    except OSError as e:
+        console.print(f"[bold red]{s['error']}: pastyd ({e})[/bold red]")
+        sys.exit(1)
+    session = args.session
+    last_stats = {}
+    try:
+        with client:
+            client.request("load", session=session, source=source_path, target=target_path or None,
+                           wpm=args.wpm, rate=args.rate)
+            PROFILER.mark("attached to pastyd")
+            for line in PROFILER.report():
+                console.print(line, highlight=False, markup=False)
+
+            def get_stats():
+                last_stats.update(client.request("stats", session=session))
+                return last_stats
+
+            def set_recording(state):
+                client.request("start" if state else "stop", session=session)
+
+            try:
+                run_dashboard(get_stats, set_recording, lambda: last_stats.get("last_error"), s)
+            except KeyboardInterrupt:
+                pass
+            # The session stays loaded in the daemon; just stop typing
+            client.request("stop", session=session)
+    except (OSError, DaemonError) as e:
+        console.print(f"[bold red]{s['error']}: {e}[/bold red]")
+        sys.exit(1)
+    console.print("\n[bold cyan]Goodbye![/bold cyan]")
+
+def run_headless(args, parser):
+    """Batch-render source -> target pairs without a keyboard or display"""
+    from src.headless import HeadlessJob, CHUNK_LOG_SUFFIX, read_manifest, run_jobs, summarize
+
+    def job(source, target):
+        target = os.path.abspath(os.path.expanduser(target))
+        return HeadlessJob(os.path.abspath(os.path.expanduser(source)), target,
+                           target + CHUNK_LOG_SUFFIX if args.chunk_log else None)
+
+    jobs = [job(source, target) for source, target in args.job or []]
+    if args.source:
+        if not args.target:
+            parser.error("--headless needs a target for each source")
+        jobs.insert(0, job(args.source, args.target))
+    try:
+        for manifest in args.manifest or []:
+            jobs.extend(read_manifest(manifest, args.chunk_log))
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        return 1
+    if not jobs:
+        parser.error("--headless needs SOURCE TARGET, --job or --manifest")
+
+    options = {"seed": args.seed}
+    if args.wpm:
+        options["wpm"] = args.wpm
+    results = []
+    started = time.perf_counter()
+    for result in run_jobs(jobs, args.workers, **options):
+        results.append(result)
+        if result["error"]:
+            console.print(f"[red]FAIL[/red] {result['source']} -> {result['target']}: {result['error']}",
+                          highlight=False)
+        else:
+            console.print(f"[green]ok[/green]   {result['target']}  {result['chars']:,} chars, "
+                          f"{result['chunks']:,} chunks, {result['seconds']:.2f}s", highlight=False)
+    summary = summarize(results, time.perf_counter() - started)
+    console.print(f"[bold]{summary['jobs']} jobs[/bold] ({summary['failed']} failed) in "
+                  f"{summary['wall_seconds']}s  ·  {summary['chars']:,} chars  ·  "
+                  f"{summary['chars_per_sec']:,} chars/s  ·  {summary['jobs_per_sec']} jobs/s  ·  "
+                  f"{summary['typing_hours']} h of simulated typing", highlight=False)
+    return 1 if summary["failed"] else 0
+
 def main():
     parser = argparse.ArgumentParser(description="Pasty CLI - Ghost Typing Tool")
     parser.add_argument("source", nargs="?", help="Source text file")
     parser.add_argument("target", nargs="?", help="Target file to append to (optional)")
     parser.add_argument("--lang", choices=["ko", "en"], default="ko", help="Interface language")
+    parser.add_argument("--metrics", metavar="FILE", help="Append engine stats to FILE as JSON lines")
+    parser.add_argument("--injector", choices=["thread", "process"],
+                        help="Type from a thread, or from a separate process that owns the keyboard "
+                             f"(default: {INJECT_MODE})")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Record the session to FILE for replay (python -m src.recorder)")
+    parser.add_argument("--wpm", type=float, metavar="N",
+                        help="Auto-type at N words per minute instead of on keypress (Ctrl+S starts/pauses)")
+    parser.add_argument("--rate", type=float, metavar="CPS",
+                        help="Adapt chunk size to your key rate to output about CPS chars/sec")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Control a session in a running pastyd instead of typing in-process")
+    parser.add_argument("--session", default="default", help="pastyd session name (with --daemon)")
+    parser.add_argument("--socket", metavar="PATH", help="pastyd control socket (with --daemon)")
+    parser.add_argument("--profile-startup", action="store_true", help="Print import and init timings at READY")
+    headless = parser.add_argument_group("headless batch mode (no keyboard or display needed)")
+    headless.add_argument("--headless", action="store_true",
+                          help="Render targets directly (overwriting them) instead of typing on keypress")
+    headless.add_argument("--job", nargs=2, action="append", metavar=("SOURCE", "TARGET"),
+                          help="Add a source/target pair (repeatable)")
+    headless.add_argument("--manifest", action="append", metavar="FILE",
+                          help='JSON lines of {"source", "target", ["log"]} (repeatable)')
+    headless.add_argument("--workers", type=int, metavar="N", help="Worker processes (default: CPU count)")
+    headless.add_argument("--seed", type=int, metavar="N", help="Seed chunking and timing for reproducible runs")
+    headless.add_argument("--chunk-log", action="store_true",
+                          help="Write each chunk's offset, size and time to TARGET.chunks.tsv")
     
     args = parser.parse_args()
+    if args.headless:
+        sys.exit(run_headless(args, parser))
+    if args.daemon:
+        # pastyd owns the engine: these only apply to an in-process one
+        local = [flag for flag, value in (("--record", args.record), ("--metrics", args.metrics),
+                                          ("--injector", args.injector)) if value]
+        if local:
+            parser.error(f"{', '.join(local)} cannot be used with --daemon")
     lang = args.lang
     s = STRINGS[lang]
+    PROFILER.mark("imports")
     
     print_header(lang)
     
     # 1. Source File
     source_path = args.source
     if not source_path:
+        from rich.prompt import Prompt
         source_path = Prompt.ask(f"[bold green]{s['source_label']}[/bold green]")
     
     # Expand and resolve path
@@ -54,17 +279,20 @@ def main():
     if not Path(source_path).exists():
         console.print(f"[bold red]{s['error']}: {s['failed_read']} ({source_path})[/bold red]")
         sys.exit(1)
-        
-    try:
-        with open(source_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        console.print(f"[bold red]{s['error']}: {e}[/bold red]")
-        sys.exit(1)
+
+    # With --daemon the daemon loads (and keeps) the source
+    if not args.daemon:
+        try:
+            content = load_source(source_path)
+        except Exception as e:
+            console.print(f"[bold red]{s['error']}: {e}[/bold red]")
+            sys.exit(1)
+        PROFILER.mark("source loaded")
 
     # 2. Target File
     target_path = args.target
     if not target_path:
+        from rich.prompt import Prompt
         target_path = Prompt.ask(f"[bold green]{s['target_label']}[/bold green] (Enter to skip)")
     
     if target_path:
@@ -73,32 +301,29 @@ def main():
             Path(target_path).touch()
 
     # 3. Armed & Ready
-    engine = GhostTyper(content, target_path)
+    if args.daemon:
+        run_client(args, source_path, target_path, s)
+        return
+
+    engine = GhostTyper(content, target_path, metrics_path=args.metrics, auto_wpm=args.wpm,
+                        adaptive=bool(args.rate), target_rate=args.rate or ADAPTIVE_TARGET_RATE,
+                        record_path=args.record, inject_mode=args.injector or INJECT_MODE)
+    last_error = [None]
+
+    def on_status_change(status, detail=None):
+        # Called from engine threads; the dashboard picks it up on its next frame
+        if status == "error":
+            last_error[0] = detail
+
+    engine.on_status_change = on_status_change
+    PROFILER.mark("engine built (pynput, chunk + key plans)")
     engine.start()
-    
-    console.print(f"\n[bold yellow]>>> {s['ready']} <<<[/bold yellow]")
-    console.print(f"[dim]Press [bold white]HOLD TO START[/bold white] (Any key logic simulated by holding space or just standard typing)[/dim]")
-    console.print(f"[bold red]CLI Mode: Press 'Enter' to toggle recording. Press 'Ctrl+C' to exit.[/bold red]\n")
-    
-    is_recording = False
-    
+    PROFILER.mark("listener started (READY)")
+    for line in PROFILER.report():
+        console.print(line, highlight=False, markup=False)
+
     try:
-        while True:
-            cmd = Prompt.ask("[bold blue]Command[/bold blue] (start/stop/exit)", choices=["start", "stop", "exit"], default="start")
-            
-            if cmd == "exit":
-                break
-            elif cmd == "start":
-                if not is_recording:
-                    is_recording = True
-                    engine.set_recording(True)
-                    console.print(f"[bold red]{s['rec']} {s['pasting']}[/bold red]")
-            elif cmd == "stop":
-                if is_recording:
-                    is_recording = False
-                    engine.set_recording(False)
-                    console.print(f("[bold green]PAUSED[/bold green]"))
-            
+        run_dashboard(engine.stats, engine.set_recording, lambda: last_error[0], s)
     except KeyboardInterrupt:
         pass
     finally:
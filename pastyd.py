@@ -0,0 +1,44 @@
+"""
+Pasty (페이스티) - Daemon (pastyd)
+"""
+
+import sys
+import signal
+import argparse
+import threading
+
+from src.config import APP_NAME, VERSION
+from src.daemon import PastyDaemon, default_socket_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pasty daemon - keeps the keyboard hook and sources warm")
+    parser.add_argument("--socket", metavar="PATH", help=f"Control socket (default: {default_socket_path()})")
+    parser.add_argument("--fake-keyboard", action="store_true",
+                        help="Use the in-memory keyboard backend (no display; for testing)")
+    args = parser.parse_args()
+
+    if args.fake_keyboard:
+        from src.backends import fake_service
+        service = fake_service()
+    else:
+        from src.service import KeyboardService
+        service = KeyboardService.shared()
+
+    daemon = PastyDaemon(service, args.socket)
+    # serve_forever() runs on this thread, so shut it down from another one
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=daemon.shutdown).start())
+    print(f"{APP_NAME} {VERSION} daemon listening on {daemon.socket_path} ({service.backend})", flush=True)
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"pastyd: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
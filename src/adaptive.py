@@ -0,0 +1,86 @@
+"""
+Pasty (페이스티) - Adaptive Chunk Sizing
+"""
+
+import time
+
+from src.config import (ADAPTIVE_TARGET_RATE, ADAPTIVE_MIN_CHARS, ADAPTIVE_MAX_CHARS,
+                        ADAPTIVE_SMOOTHING, ADAPTIVE_MAX_LATENCY, ADAPTIVE_MAX_BACKLOG,
+                        ADAPTIVE_RECOVERY, ADAPTIVE_REPORT_INTERVAL)
+
+
+class ChunkController:
+    """
+    Picks chars-per-press so that output tracks `target_rate` chars/sec.
+
+    Slow tapping gets bigger chunks, fast tapping smaller ones: the base size is
+    target_rate * (smoothed inter-press time). A congestion scale multiplies it:
+    halved whenever injection latency or the queue backlog exceeds its limit, and
+    recovered a little on every uncongested press (AIMD), so a slow backend can
+    never build an unbounded backlog.
+    """
+
+    def __init__(self, target_rate=ADAPTIVE_TARGET_RATE, min_chars=ADAPTIVE_MIN_CHARS,
+                 max_chars=ADAPTIVE_MAX_CHARS, smoothing=ADAPTIVE_SMOOTHING,
+                 max_latency=ADAPTIVE_MAX_LATENCY, max_backlog=ADAPTIVE_MAX_BACKLOG,
+                 recovery=ADAPTIVE_RECOVERY, report_interval=ADAPTIVE_REPORT_INTERVAL):
+        if not 1 <= min_chars <= max_chars:
+            raise ValueError(f"Invalid chunk range: {min_chars}-{max_chars}")
+        self.target_rate = target_rate
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.smoothing = smoothing
+        self.max_latency = max_latency
+        self.max_backlog = max_backlog
+        self.recovery = recovery
+        self.report_interval = report_interval
+
+        self.interval = None   # Smoothed seconds between presses
+        self.latency = 0.0     # Smoothed injection latency (written by the injector thread)
+        self.scale = 1.0       # Congestion multiplier in [min/max, 1]
+        self.size = min_chars  # Last chosen chunk size
+        self.last_press = None
+        self.last_report = 0.0
+
+    def next_size(self, queue_depth, now=None):
+        """Chunk size for a press happening now"""
+        now = time.monotonic() if now is None else now
+        if self.last_press is not None:
+            # Ignore long pauses: they mean the operator stopped, not that they type slowly
+            dt = min(now - self.last_press, 1.0)
+            a = self.smoothing
+            self.interval = dt if self.interval is None else a * dt + (1 - a) * self.interval
+        self.last_press = now
+
+        if self.latency > self.max_latency or queue_depth > self.max_backlog:
+            self.scale = max(self.scale * 0.5, self.min_chars / self.max_chars)
+        else:
+            self.scale = min(1.0, self.scale + self.recovery)
+
+        base = self.target_rate * self.interval if self.interval else self.min_chars
+        self.size = max(self.min_chars, min(self.max_chars, round(base * self.scale)))
+        return self.size
+
+    def record_latency(self, seconds):
+        a = self.smoothing
+        self.latency = a * seconds + (1 - a) * self.latency
+
+    def due_report(self, now=None):
+        """True at most once per report_interval"""
+        now = time.monotonic() if now is None else now
+        if now - self.last_report < self.report_interval:
+            return False
+        self.last_report = now
+        return True
+
+    def state(self):
+        """Controller state for status callbacks / stats"""
+        interval = self.interval or 0.0
+        return {
+            "chunk_chars": self.size,
+            "press_interval_ms": round(interval * 1000, 1),
+            "effective_rate": round(self.size / interval, 1) if interval else 0.0,
+            "target_rate": self.target_rate,
+            "scale": round(self.scale, 3),
+            "latency_ms": round(self.latency * 1000, 3),
+        }
@@ -0,0 +1,455 @@
+"""
+Pasty (페이스티) - asyncio Engine API
+"""
+
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import (INJECT_QUEUE_SIZE, INJECT_BACKPRESSURE, WRITER_FLUSH_CHARS,
+                        WRITER_FLUSH_INTERVAL_MS, WRITER_FSYNC_ON_STOP, AIO_EVENT_QUEUE_SIZE)
+from src.engine import GhostTyper
+from src.writer import TargetWriter
+from src.recorder import INJECT, REFUSED
+from src.service import TypedChunk
+
+# Queue marker: stop the injector / end an events() iterator
+_STOP = object()
+
+_output_executor = None
+_output_lock = threading.Lock()
+
+
+def output_executor():
+    """
+    The one thread that sends keystrokes for every async engine in the process.
+    There is a single OS keyboard, so sessions share it instead of each owning a thread.
+    """
+    global _output_executor
+    with _output_lock:
+        if _output_executor is None:
+            _output_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pasty-output")
+        return _output_executor
+
+
+class AsyncInjector:
+    """Bounded asyncio queue of chunks, typed in FIFO order on the shared output thread"""
+
+    mode = "asyncio"
+
+    def __init__(self, type_func, queue_size=INJECT_QUEUE_SIZE, on_typed=None, executor=None):
+        self.type_func = type_func
+        self.on_typed = on_typed  # Called on the loop after each chunk
+        self.executor = executor
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.room = asyncio.Event()  # Set whenever a chunk leaves the queue
+        self.task = None
+        self.rejected = 0
+
+    @property
+    def pending(self):
+        """Number of chunks waiting to be typed"""
+        return self.queue.qsize()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, chunk):
+        """Queue without waiting; False if the queue is full"""
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def wait_for_room(self):
+        """Wait until submit() has room (backpressure)"""
+        while self.queue.full():
+            self.room.clear()
+            await self.room.wait()
+
+    async def stop(self, drain=True):
+        """Stop the consumer task. With drain=True every queued chunk is typed first."""
+        if self.task is None:
+            return
+        if not drain:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.room.set()
+        await self.queue.put(_STOP)
+        await self.task
+        self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        executor = self.executor or output_executor()
+        while True:
+            chunk = await self.queue.get()
+            self.room.set()
+            if chunk is _STOP:
+                return
+            await loop.run_in_executor(executor, self.type_func, chunk)
+            if self.on_typed:
+                self.on_typed(chunk)
+
+
+class AsyncTargetWriter:
+    """
+    Target file sink for the event loop. Text is buffered on the loop; the actual
+    appends go through a TargetWriter in the default executor, so the loop never
+    blocks on disk. Every file operation (write, retract, segment, close) is queued
+    to one consumer task, so they reach the file one at a time and in call order.
+    Must be used from the loop thread.
+    """
+
+    def __init__(self, path=None, flush_chars=WRITER_FLUSH_CHARS,
+                 flush_interval_ms=WRITER_FLUSH_INTERVAL_MS, fsync_on_stop=WRITER_FSYNC_ON_STOP,
+                 on_error=None, latency=None, recorder=None):
+        self.path = path or None
+        self.flush_chars = flush_chars
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.fsync_on_stop = fsync_on_stop
+        # Does the blocking I/O (open handle, error reporting, latency, dropped chars)
+        self.file = TargetWriter(path, flush_chars=flush_chars, fsync_on_stop=fsync_on_stop,
+                                 on_error=on_error, latency=latency, recorder=recorder)
+        self.buffer = []
+        self.entries = []  # History entries (TypedChunk) of the buffered text
+        self.buffered_chars = 0
+        self.batch_started = 0.0
+        self.ops = asyncio.Queue()  # (function, args, future) for the consumer, in call order
+        self.consumer = None
+        self.pending = asyncio.Event()
+        self.flusher = None
+
+    @property
+    def dropped_chars(self):
+        return self.file.dropped_chars
+
+    def start(self):
+        if self.flusher is None:
+            self.flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def write(self, text, entry=None):
+        """Buffer text for the target file (no-op without a path; see TargetWriter.write)"""
+        if not self.path or not text:
+            return
+        was_empty = not self.buffer
+        self.buffer.append(text)
+        if entry is not None:
+            self.entries.append(entry)
+        self.buffered_chars += len(text)
+        if self.buffered_chars >= self.flush_chars:
+            self._queue(self._append, *self._take(), False)
+        elif was_empty:
+            self.batch_started = asyncio.get_running_loop().time()
+            self.pending.set()
+
+    async def flush(self, fsync=False):
+        """Write out everything buffered so far (after every operation queued before it)"""
+        await self._queue(self._append, *self._take(), fsync)
+
+    def begin_segment(self, source_start):
+        """
+        Log subsequent writes as source text starting at `source_start` (see TargetWriter).
+        Returns a future that is done once the reset has been applied.
+        """
+        return self._queue(self._begin, *self._take(), source_start)
+
+    def retract(self, raw, entry=None):
+        """Remove `raw`, the text most recently written, from the end of the target"""
+        if not self.path or not raw:
+            return
+        if self.buffer and self.buffer[-1] == raw:
+            self.buffer.pop()
+            self.buffered_chars -= len(raw)
+            if self.entries and self.entries[-1] is entry:
+                self.entries.pop()
+            return
+        self._queue(self._truncate, *self._take(), raw, entry)
+
+    def set_path(self, path):
+        """Switch to a new target file; pending text goes to the old one first"""
+        path = path or None
+        if path == self.path:
+            return
+        batch = self._take()
+        self.path = path
+        if batch[1]:
+            self._queue(self._append, *batch, False)
+
+    async def close(self, fsync=None):
+        """Flush, stop the flusher and release the file handle"""
+        if fsync is None:
+            fsync = self.fsync_on_stop
+        if self.flusher:
+            self.flusher.cancel()
+            self.flusher = None
+        # Queued behind every pending write/retract/segment
+        await self.flush(fsync)
+        await self._queue(self.file.close, False)
+        if self.consumer:
+            self.consumer.cancel()
+            self.consumer = None
+
+    def _take(self):
+        """Detach the buffered batch (with its history entries) and the path it belongs to"""
+        text = "".join(self.buffer)
+        self.buffer.clear()
+        entries, self.entries = self.entries, []
+        self.buffered_chars = 0
+        return self.path, text, entries
+
+    def _queue(self, func, *args):
+        """Run func(*args) in the executor after every operation queued before it"""
+        loop = asyncio.get_running_loop()
+        if self.consumer is None:
+            self.consumer = loop.create_task(self._consume())
+        future = loop.create_future()
+        self.ops.put_nowait((func, args, future))
+        return future
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self.ops.get()
+            try:
+                result = await loop.run_in_executor(None, func, *args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    def _append(self, path, text, entries, fsync):
+        # Executor thread
+        dropped = self.file.dropped_chars
+        self.file.set_path(path)
+        self.file.write(text)
+        self.file.flush(fsync)
+        if self.file.dropped_chars != dropped:
+            for entry in entries:
+                entry.written = False
+
+    def _truncate(self, path, text, entries, raw, entry):
+        # Executor thread
+        self._append(path, text, entries, False)
+        self.file.retract(raw, entry)
+
+    def _begin(self, path, text, entries, source_start):
+        # Executor thread
+        self._append(path, text, entries, False)
+        self.file.begin_segment(source_start)
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.pending.wait()
+            self.pending.clear()
+            remaining = self.batch_started + self.flush_interval - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            if self.buffer:
+                await self._queue(self._append, *self._take(), False)
+
+
+class AsyncGhostTyper(GhostTyper):
+    """
+    GhostTyper driven by an asyncio event loop.
+
+    start/stop/set_recording are awaitable, key events hop onto the loop once and
+    then flow through bounded asyncio queues (presses -> chunks) instead of threads,
+    and events() streams (status, detail) pairs: True/False, "error" and
+    "progress" with (content_index, total). Many engines can share one loop;
+    keystrokes from all of them go out through a single output thread.
+    advance() queues the next chunk programmatically, without a key event.
+    """
+
+    def __init__(self, source_content, target_path=None, queue_size=INJECT_QUEUE_SIZE,
+                 backpressure=INJECT_BACKPRESSURE, fsync_on_stop=WRITER_FSYNC_ON_STOP,
+                 event_queue_size=AIO_EVENT_QUEUE_SIZE, executor=None, **options):
+        super().__init__(source_content, None, queue_size=queue_size, backpressure=backpressure,
+                         fsync_on_stop=fsync_on_stop, **options)
+        self.backpressure = backpressure
+        # Loop-side replacements for the injector thread and the writer thread
+        # _type_chars reports "progress" itself (from the output thread; _notify hops to the loop)
+        self.injector = AsyncInjector(self._type_chars, queue_size, executor=executor)
+        self.writer = AsyncTargetWriter(target_path, fsync_on_stop=fsync_on_stop,
+                                        on_error=self._on_error, latency=self.metrics.write_latency,
+                                        recorder=self.recorder)
+        if self.autotyper:
+            self.autotyper.inject = self._advance_threadsafe
+        # Key presses waiting for a chunk slot; overflow is counted in metrics.dropped
+        self.presses = asyncio.Queue(maxsize=queue_size)
+        self.advance_lock = asyncio.Lock()
+        self.event_queue_size = event_queue_size
+        self.subscribers = []
+        self.events_dropped = 0
+        self.loop = None
+        self.loop_thread = None
+        self.pump = None
+
+    async def start(self):
+        """Start receiving keyboard events on the running loop"""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        # Applied before the first write can reach the file
+        await self.writer.begin_segment(self.content_index)
+        self.writer.start()
+        self.injector.start()
+        if self.pump is None:
+            self.pump = self.loop.create_task(self._pump())
+        if self.dumper:
+            self.dumper.start()
+        self.service.attach(self)
+        self.attached = True
+
+    async def stop(self, drain=True):
+        """Stop receiving events and finish (or discard) pending injections"""
+        if self.attached:
+            self.service.detach(self)
+            self.attached = False
+        self.accept_keys = False
+        if self.autotyper:
+            # Its thread may be waiting on this loop; join it off the loop
+            await self.loop.run_in_executor(None, self.autotyper.stop)
+        if self.pump:
+            self.pump.cancel()
+            self.pump = None
+        await self.injector.stop(drain=drain)
+        if self.verify_on_stop and self.writer.path:
+            self._report_check(await self.verify())
+        await self.writer.close()
+        if self.dumper:
+            await self.loop.run_in_executor(None, self.dumper.stop)
+        if self.recorder:
+            await self.loop.run_in_executor(None, self.recorder.close)
+        for queue in self.subscribers:
+            self._offer(queue, _STOP)
+
+    async def set_recording(self, state):
+        """Set recording state"""
+        self.held_chords.clear()
+        self.is_recording = state
+        self.accept_keys = state and self.autotyper is None
+        if self.autotyper:
+            if state:
+                self.autotyper.resume()
+            else:
+                self.autotyper.pause()
+        if not state:
+            await self.writer.flush()
+        self._notify(state)
+
+    async def advance(self, pressed_at=None):
+        """
+        Queue the next chunk and return it ("" if refused, None at the end of the source).
+        In "block" mode this waits for room in the chunk queue.
+        """
+        async with self.advance_lock:
+            self.metrics.keypresses += 1
+            pressed_at = pressed_at or time.perf_counter()
+            while True:
+                # Read and commit the position in one locked step: a seek or load made
+                # while waiting for room must not be overwritten
+                with self.swap_lock:
+                    session = self.session
+                    index = session.content_index
+                    if not session.source_content or index >= len(session.source_content):
+                        return None
+                    wait = self.backpressure == "block" and self.injector.queue.full()
+                    if not wait:
+                        length = session.plan.length_at(index)
+                        if self.controller:
+                            length = self._adaptive_length(session.plan, index, length)
+                        chars = session.source_content[index : index + length]
+                        if not self.injector.submit((session, index, chars, pressed_at)):
+                            self.metrics.dropped += 1
+                            if self.recorder:
+                                self.recorder.record(REFUSED, index, at=pressed_at)
+                            return ""
+                        session.content_index = index + len(chars)
+                        entry = TypedChunk(index, len(chars), pressed_at)
+                        session.history.append(entry)
+                        if self.recorder:
+                            self.recorder.record(INJECT, index, len(chars), at=pressed_at)
+                        self.writer.write(chars, entry)
+                        return chars
+                await self.injector.wait_for_room()
+
+    async def verify(self):
+        """Check the target against the typed source (see GhostTyper.verify)"""
+        await self.writer.flush()
+        return await self.loop.run_in_executor(None, self._check_target, self.writer.file)
+
+    async def events(self):
+        """Async iterator of (status, detail) events until stop()"""
+        queue = asyncio.Queue(maxsize=self.event_queue_size)
+        self.subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _STOP:
+                    return
+                yield event
+        finally:
+            self.subscribers.remove(queue)
+
+    def stats(self):
+        stats = super().stats()
+        stats["events_dropped"] = self.events_dropped
+        return stats
+
+    def _inject_chars(self):
+        # Listener thread: the key passed GhostTyper's filters; hand it to the loop
+        self.loop.call_soon_threadsafe(self._on_key, time.perf_counter())
+
+    def _rewind(self, chunks, erased=0):
+        # Listener thread: queue it with the presses so it applies in key order
+        self.loop.call_soon_threadsafe(self._on_key, (chunks, erased))
+
+    def _on_key(self, press):
+        try:
+            self.presses.put_nowait(press)
+        except asyncio.QueueFull:
+            self.metrics.dropped += 1
+
+    async def _pump(self):
+        while True:
+            press = await self.presses.get()
+            if isinstance(press, tuple):
+                async with self.advance_lock:
+                    GhostTyper._rewind(self, *press)
+            else:
+                await self.advance(press)
+
+    def _advance_threadsafe(self):
+        # Auto-type thread: blocks until the chunk is queued, so backpressure paces it
+        return asyncio.run_coroutine_threadsafe(self.advance(), self.loop).result()
+
+    def _notify(self, status, detail=None):
+        if self.on_status_change:
+            self.on_status_change(status, detail)
+        elif status == "error" and not self.subscribers:
+            print(detail)
+        if not self.subscribers:
+            return
+        if threading.get_ident() == self.loop_thread:
+            self._publish((status, detail))
+        else:
+            # Errors may come from the output or writer executor threads
+            self.loop.call_soon_threadsafe(self._publish, (status, detail))
+
+    def _publish(self, event):
+        for queue in self.subscribers:
+            self._offer(queue, event)
+
+    def _offer(self, queue, event):
+        # A slow consumer loses its oldest events rather than stalling the engine
+        if queue.full():
+            queue.get_nowait()
+            self.events_dropped += 1
+        queue.put_nowait(event)
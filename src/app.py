@@ -4,94 +4,284 @@ Pasty (페이스티) - Main Application Logic
 """
 
 import os
-import sys
-import json
-import random
-import threading
-from pathlib import Path
-
-from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                                QHBoxLayout, QLabel, QPushButton, QFileDialog, QFrame, QLineEdit)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QIcon, QPalette, QBrush
-from pynput import keyboard
-
-try:
-    import darkdetect
-except ImportError:
-    darkdetect = None
-
-from src.config import APP_NAME, VERSION, STRINGS
+
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                                QLabel, QPushButton, QFileDialog, QLineEdit, QStyle, QStyleOption)
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QColor, QPainter, QPalette
+
+# pynput is only loaded by the engine when a source is opened; darkdetect only
+# when the "system" theme has to be resolved
+from src.config import (APP_NAME, VERSION, STRINGS, SOURCE_DEBOUNCE_MS, PREVIEW_ROWS, PREVIEW_FPS,
+                        BRIDGE_FPS, ADAPTIVE_TARGET_RATE)
+from src.bridge import EventBridge
 from src.engine import GhostTyper
+from src.keyplan import load_keyplan
+from src.preview import PreviewModel, TYPED, NEXT
+from src.service import KeyboardService
+from src.settings import SettingsStore, DEFAULTS
+from src.source import load_source, SourceCache
+from src.theme import stylesheet, resolve_theme, next_mode, SystemThemeWatcher
+
+class SourceLoadSignals(QObject):
+    # request id, cache key, (content, keyplan) or None, error message or None
+    finished = Signal(int, object, object, object)
+
+class ThemeSignals(QObject):
+    # Emitted from the darkdetect listener thread; delivered on the UI thread
+    changed = Signal(str)
+
+class EngineSignals(QObject):
+    """
+    UI end of the engine event bridge: engines post into an EventBridge from
+    their own threads, and a timer drains it at BRIDGE_FPS on the UI thread,
+    emitting coalesced signals however fast events arrive.
+    """
+
+    recording_changed = Signal(bool)
+    error = Signal(str)
+    progress = Signal(int, int)  # content_index, total
+    rate = Signal(object)        # ChunkController.state()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bridge = EventBridge()
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // BRIDGE_FPS)
+        self.timer.timeout.connect(self.drain)
+        self.timer.start()
+
+    @property
+    def dropped(self):
+        """Events overwritten before the UI drained them"""
+        return self.bridge.dropped
+
+    def attach(self, engine):
+        engine.on_status_change = self.bridge.post
+
+    def drain(self):
+        transitions, errors, progress, rate = self.bridge.collect()
+        for state in transitions:
+            self.recording_changed.emit(state)
+        for message in errors:
+            self.error.emit(message)
+        if progress:
+            self.progress.emit(*progress)
+        if rate:
+            self.rate.emit(rate)
+
+class SettingsLoadSignals(QObject):
+    finished = Signal(object)  # Settings dict
+
+class SettingsLoadTask(QRunnable):
+    """Reads the settings store on a pool thread"""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.signals = SettingsLoadSignals()
+
+    def run(self):
+        self.signals.finished.emit(self.store.load())
+
+class SourceLoadTask(QRunnable):
+    """Reads a source and its keystroke plan on a pool thread"""
+
+    def __init__(self, request_id, path, cache):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.cache = cache
+        self.signals = SourceLoadSignals()
+
+    def run(self):
+        try:
+            key = SourceCache.key_for(self.path)
+            loaded = self.cache.get(key)
+            if loaded is None:
+                content = load_source(self.path)
+                loaded = (content, load_keyplan(content, KeyboardService.shared().backend))
+                self.cache.put(key, loaded)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            self.signals.finished.emit(self.request_id, None, None, str(e))
+            return
+        self.signals.finished.emit(self.request_id, key, loaded, None)
+
+class PreviewPanel(QWidget):
+    """
+    Upcoming-text view of the live engine: typed text dimmed, the next chunk
+    highlighted. Only the visible rows are ever read or painted, and the engine
+    is polled at PREVIEW_FPS, so any amount of progress between frames is one repaint.
+    """
+
+    PADDING = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("preview")
+        self.engine = None
+        self.model = None
+        self.position = None  # (content_index, next chunk length) last shown
+        self.rows = []
+        self.setFixedHeight(PREVIEW_ROWS * self.fontMetrics().lineSpacing() + 2 * self.PADDING)
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // PREVIEW_FPS)
+        self.timer.timeout.connect(self.tick)
+
+    def set_engine(self, engine):
+        self.engine = engine
+        self.model = None
+        self.position = None
+        self.rows = []
+        if engine:
+            self.timer.start()
+        else:
+            self.timer.stop()
+        self.update()
+
+    def tick(self):
+        source, index, chunk_len = self.engine.position()
+        if self.model is None or self.model.source is not source:
+            self.model = PreviewModel(source)  # New or hot-swapped source
+            self.position = None
+        elif not self.model.lines.complete:
+            self.model.lines.extend()  # Line numbers fill in a step per frame
+        if (index, chunk_len) != self.position:
+            if self.position is not None:
+                self.model.follow()  # Typing snaps a scrolled view back
+            self.position = (index, chunk_len)
+            self.refresh()
+
+    def refresh(self):
+        count = max(1, (self.height() - 2 * self.PADDING) // self.fontMetrics().lineSpacing())
+        self.rows = self.model.rows(*self.position, count)
+        self.update()
+
+    def wheelEvent(self, event):
+        if self.model and self.position:
+            # 120 units per wheel notch -> 3 rows
+            self.model.scroll(-event.angleDelta().y() // 40, self.position[0])
+            self.refresh()
+        event.accept()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # Background and border come from the stylesheet (QWidget#preview)
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+
+        palette = self.palette()
+        text_color = palette.color(QPalette.WindowText)
+        dim_color = QColor(text_color)
+        dim_color.setAlpha(110)
+        metrics = self.fontMetrics()
+        gutter = metrics.horizontalAdvance("00000000")
+        y = self.PADDING
+        for line, segments in self.rows:
+            baseline = y + metrics.ascent()
+            if line is not None:
+                painter.setPen(dim_color)
+                number = str(line + 1)
+                painter.drawText(gutter - metrics.horizontalAdvance(number) - self.PADDING, baseline, number)
+            x = gutter
+            for text, kind in segments:
+                text = text.replace("\t", "    ")
+                width = metrics.horizontalAdvance(text)
+                if kind == NEXT:
+                    painter.fillRect(x, y, width, metrics.lineSpacing(), palette.color(QPalette.Highlight))
+                    painter.setPen(palette.color(QPalette.HighlightedText))
+                else:
+                    painter.setPen(dim_color if kind == TYPED else text_color)
+                painter.drawText(x, baseline, text)
+                x += width
+            y += metrics.lineSpacing()
 
 class PastyApp(QMainWindow):
     def __init__(self):
         super().__init__()
         
-        # Settings
-        self.settings_path = Path("settings.json")
-        self.load_settings()
+        # Engine events reach the UI thread through a coalescing bridge
+        self.engine_signals = EngineSignals(self)
+        self.engine_signals.recording_changed.connect(self.set_rec_indicator)
+        self.engine_signals.error.connect(self.on_engine_error)
+        self.engine_signals.progress.connect(self.on_engine_progress)
+        self.engine_signals.rate.connect(self.on_engine_rate)
+        self.rate_text = ""  # Adaptive chunking's output rate, shown next to the progress
+
+        # Settings: defaults until the store has been read on a pool thread
+        self.settings = SettingsStore()
+        self.apply_settings(DEFAULTS)
         
-        # Engine
+        # Engine (at most one live at a time)
         self.engine = None
+        self.engine_key = None
+        self.source_path = ""
+        self.target_path = ""
+
+        # Source loading: debounced path edits, loads on a pool thread
+        self.source_cache = SourceCache()
+        self.load_pool = QThreadPool.globalInstance()
+        self.load_request = 0      # Latest request id; older results are ignored
+        self.loading = False
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(SOURCE_DEBOUNCE_MS)
+        self.load_timer.timeout.connect(self.load_source_file)
         
         self.setup_ui()
+        self.apply_theme()
         self.update_language()
 
-    # ... (load_settings, save_settings, setup_ui same as before) ...
+        # Follow OS theme changes while in "system" mode (watcher starts on first use)
+        self.theme_signals = ThemeSignals()
+        self.theme_signals.changed.connect(self.on_system_theme_changed)
+        self.theme_watcher = SystemThemeWatcher(self.theme_signals.changed.emit)
+
+        self.load_settings()
 
     def load_settings(self):
-        """Load settings from JSON, create if doesn't exist"""
-        if self.settings_path.exists():
-            try:
-                with open(self.settings_path, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                    self.current_theme = settings.get("theme", "system")
-                    self.current_language = settings.get("language", "ko")
-            except:
-                self.current_theme = "system"
-                self.current_language = "ko"
-        else:
-            self.current_theme = "system"
-            self.current_language = "ko"
-            self.save_settings()
-        
-        # Resolve system theme
+        """Read the settings store off the UI thread; applied when it arrives"""
+        task = SettingsLoadTask(self.settings)
+        task.signals.finished.connect(self.on_settings_loaded)
+        self.load_pool.start(task)
+
+    def apply_settings(self, settings):
+        self.current_theme = settings["theme"]
+        self.current_language = settings["language"] if settings["language"] in STRINGS else "ko"
+        self.auto_wpm = settings["auto_wpm"]
+        self.adaptive_rate = settings["adaptive_rate"]
+        self.chunk_strategy = settings["chunk_strategy"]
+        self.resolved_theme = resolve_theme(self.current_theme)
+
+    def on_settings_loaded(self, settings):
+        self.apply_settings(settings)
         if self.current_theme == "system":
-            if darkdetect and darkdetect.isDark():
-                self.resolved_theme = "dark"
-            else:
-                self.resolved_theme = "light"
-        else:
-            self.resolved_theme = self.current_theme
+            self.theme_watcher.start()
+        self.apply_theme()
+        self.update_language()
 
     def save_settings(self):
-        """Save settings to JSON"""
-        settings = {
-            "theme": self.current_theme,
-            "language": self.current_language
-        }
-        try:
-            with open(self.settings_path, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Failed to save settings: {e}")
+        """Schedule a settings write (atomic, on the store's background thread)"""
+        self.settings.update(theme=self.current_theme, language=self.current_language,
+                             auto_wpm=self.auto_wpm, adaptive_rate=self.adaptive_rate)
+
+    def remember_source(self):
+        """Record where the live engine's source was left, for the next time it is opened"""
+        if self.engine and self.engine_key:
+            self.settings.remember_source(self.engine_key, self.engine.content_index,
+                                          self.engine.chunk_strategy, self.target_path)
 
     def setup_ui(self):
-        """Setup minimal flat UI with Frutiger Aero buttons"""
+        """Setup minimal flat UI with Frutiger Aero buttons (styled by objectName, see src.theme)"""
         s = STRINGS[self.current_language]
         self.setWindowTitle(f"{s['title']} {VERSION}")
-        self.setFixedSize(500, 450)
-        
-        # Simple solid background
-        if self.resolved_theme == "dark":
-            self.setStyleSheet("QMainWindow { background-color: #1a1a1a; }")
-        else:
-            self.setStyleSheet("QMainWindow { background-color: #f5f5f5; }")
+        self.setFixedSize(500, 450 + PREVIEW_ROWS * 20)
+        self.setObjectName("pasty")
         
         # Central widget
         central_widget = QWidget()
-        central_widget.setStyleSheet("background: transparent;")
+        central_widget.setObjectName("central")
         self.setCentralWidget(central_widget)
         
         # Main layout
@@ -99,158 +289,31 @@ class PastyApp(QMainWindow):
         main_layout.setContentsMargins(30, 20, 30, 20)
         main_layout.setSpacing(12)
         
-        # Minimal colors
-        if self.resolved_theme == "dark":
-            text_color = "#ffffff"
-            secondary_color = "#999999"
-            accent_color = "#2196F3"
-            card_color = "#2a2a2a"
-            rec_color = "#f44336"
-        else:
-            text_color = "#333333"
-            secondary_color = "#666666"
-            accent_color = "#2196F3"
-            card_color = "#ffffff"
-            rec_color = "#f44336"
-        
         # Title (no header controls)
         self.title_label = QLabel()
+        self.title_label.setObjectName("title")
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet(f"font-size: 24px; font-weight: 600; color: {text_color}; margin: 10px;")
         main_layout.addWidget(self.title_label)
         
         self.subtitle_label = QLabel()
+        self.subtitle_label.setObjectName("subtitle")
         self.subtitle_label.setAlignment(Qt.AlignCenter)
-        self.subtitle_label.setStyleSheet(f"font-size: 12px; color: {secondary_color}; margin-bottom: 15px;")
         main_layout.addWidget(self.subtitle_label)
         
         # Source file
         self.source_label = QLabel()
-        self.source_label.setStyleSheet(f"font-size: 11px; color: {text_color}; margin-top: 5px;")
+        self.source_label.setObjectName("source_label")
         main_layout.addWidget(self.source_label)
         
         source_layout = QHBoxLayout()
         self.source_path_input = QLineEdit()
+        self.source_path_input.setObjectName("path")
         self.source_path_input.setPlaceholderText(s['source_label'])
-        
-        # Frutiger Aero Style
-        if self.resolved_theme == "dark":
-            input_style = """
-                QLineEdit {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #333333, stop:1 #2a2a2a);
-                    color: #e0e0e0;
-                    border: 1px solid #555;
-                    border-radius: 5px;
-                    padding: 8px;
-                    font-size: 11px;
-                }
-            """
-            btn_style = """
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #4a90e2, stop:0.5 #357abd, stop:1 #2a68a8);
-                    color: white;
-                    border: 1px solid #1a4b78;
-                    border-radius: 5px;
-                    padding: 8px 16px;
-                    font-family: 'Segoe UI', sans-serif;
-                    font-size: 11px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #5ca0f2, stop:0.5 #4a90e2, stop:1 #357abd);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #2a68a8, stop:1 #357abd);
-                    padding-top: 9px;
-                    padding-left: 17px;
-                }
-            """
-            start_btn_style = """
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #4a90e2, stop:0.5 #357abd, stop:1 #2a68a8);
-                    color: white;
-                    border: 1px solid #1a4b78;
-                    border-radius: 8px;
-                    font-size: 14px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #5ca0f2, stop:0.5 #4a90e2, stop:1 #357abd);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #2a68a8, stop:1 #357abd);
-                    padding-top: 2px;
-                    padding-left: 2px;
-                }
-                QPushButton:disabled {
-                    background: #2a2a2a;
-                    color: #555;
-                    border: 1px solid #444;
-                }
-            """
-        else:
-            input_style = """
-                QLineEdit {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #ffffff, stop:1 #f0f0f0);
-                    color: #333333;
-                    border: 1px solid #ccc;
-                    border-bottom: 1px solid #bbb;
-                    border-radius: 5px;
-                    padding: 8px;
-                    font-size: 11px;
-                }
-            """
-            btn_style = """
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #eefeff, stop:0.5 #d0f0ff, stop:1 #b0dfff);
-                    color: #004488;
-                    border: 1px solid #88ccee;
-                    border-radius: 5px;
-                    padding: 8px 16px;
-                    font-family: 'Segoe UI', sans-serif;
-                    font-size: 11px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #ffffff, stop:0.5 #e0f5ff, stop:1 #cceeff);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #b0dfff, stop:1 #d0f0ff);
-                    padding-top: 9px;
-                    padding-left: 17px;
-                }
-            """
-            start_btn_style = """
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #8accff, stop:0.5 #59aaff, stop:1 #4090ee);
-                    color: white;
-                    border: 1px solid #3070cc;
-                    border-radius: 8px;
-                    font-size: 14px;
-                    font-weight: bold;
-                    text-shadow: 0px 1px 1px rgba(0,0,0,0.3);
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #a0d8ff, stop:0.5 #70b8ff, stop:1 #50a0ff);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #4090ee, stop:1 #59aaff);
-                    padding-top: 2px;
-                    padding-left: 2px;
-                }
-                QPushButton:disabled {
-                    background: #f0f0f0;
-                    color: #aaa;
-                    border: 1px solid #ccc;
-                }
-            """
-
-        self.source_path_input.setStyleSheet(input_style)
         self.source_path_input.textChanged.connect(self.on_source_text_changed)
         source_layout.addWidget(self.source_path_input, 1)
         
         self.source_browse_btn = QPushButton()
-        self.source_browse_btn.setStyleSheet(btn_style)
+        self.source_browse_btn.setObjectName("browse")
         self.source_browse_btn.setCursor(Qt.PointingHandCursor)
         self.source_browse_btn.clicked.connect(self.browse_source)
         source_layout.addWidget(self.source_browse_btn)
@@ -259,17 +322,17 @@ class PastyApp(QMainWindow):
         
         # Target file
         self.target_label = QLabel()
-        self.target_label.setStyleSheet(f"font-size: 11px; color: {text_color}; margin-top: 10px;")
+        self.target_label.setObjectName("target_label")
         main_layout.addWidget(self.target_label)
         
         target_layout = QHBoxLayout()
         self.target_path_input = QLineEdit()
-        self.target_path_input.setStyleSheet(input_style)
+        self.target_path_input.setObjectName("path")
         self.target_path_input.textChanged.connect(self.on_target_text_changed)
         target_layout.addWidget(self.target_path_input, 1)
         
         self.target_browse_btn = QPushButton()
-        self.target_browse_btn.setStyleSheet(btn_style)
+        self.target_browse_btn.setObjectName("browse")
         self.target_browse_btn.setCursor(Qt.PointingHandCursor)
         self.target_browse_btn.clicked.connect(self.browse_target)
         
@@ -277,35 +340,38 @@ class PastyApp(QMainWindow):
         
         main_layout.addLayout(target_layout)
         
-        # REC indicator
+        # Upcoming text around the typing position
+        self.preview = PreviewPanel()
+        main_layout.addWidget(self.preview)
+        
+        # REC indicator (colored while the "recording" property is set)
         self.rec_label = QLabel()
+        self.rec_label.setObjectName("rec")
         self.rec_label.setAlignment(Qt.AlignCenter)
-        self.rec_label.setStyleSheet(f"font-size: 13px; font-weight: 600; color: transparent; margin: 10px;")
         main_layout.addWidget(self.rec_label)
         
-        # Start button
+        # Start button (its :disabled style covers the not-ready state)
         self.start_btn = QPushButton()
+        self.start_btn.setObjectName("start")
         self.start_btn.setFixedHeight(50)
         self.start_btn.setEnabled(False)
         self.start_btn.setCursor(Qt.PointingHandCursor)
-        
-        self.start_btn.setStyleSheet(start_btn_style)
-        self.start_btn_style_normal = start_btn_style  # Save for logic use
-        self.start_btn_style_disabled = start_btn_style.replace("QPushButton {", "QPushButton { /* disabled override */") # Hacky but handled by disabled state in CSS above
         self.start_btn.pressed.connect(self.on_press_start)
         self.start_btn.released.connect(self.on_release_start)
         main_layout.addWidget(self.start_btn)
         
-        self.rec_color_style = rec_color
-        
         main_layout.addStretch()
         
         # Copyright
         self.copyright_label = QLabel()
+        self.copyright_label.setObjectName("copyright")
         self.copyright_label.setAlignment(Qt.AlignCenter)
-        self.copyright_label.setStyleSheet(f"font-size: 9px; color: {secondary_color}; margin-top: 10px;")
         main_layout.addWidget(self.copyright_label)
 
+    def apply_theme(self):
+        """Restyle the whole app in one pass with the cached stylesheet"""
+        QApplication.instance().setStyleSheet(stylesheet(self.resolved_theme))
+
     def update_language(self):
         """Update all text"""
         s = STRINGS[self.current_language]
@@ -326,8 +392,18 @@ class PastyApp(QMainWindow):
             self.start_btn.setText(s['ready'])
 
     def toggle_theme(self):
-        # ... logic if needed ...
-        pass
+        """Cycle system -> light -> dark; the engine session is untouched"""
+        self.current_theme = next_mode(self.current_theme)
+        self.resolved_theme = resolve_theme(self.current_theme)
+        if self.current_theme == "system":
+            self.theme_watcher.start()
+        self.apply_theme()
+        self.save_settings()
+
+    def on_system_theme_changed(self, name):
+        if self.current_theme == "system" and name != self.resolved_theme:
+            self.resolved_theme = name
+            self.apply_theme()
 
     def toggle_language(self):
         """Toggle language"""
@@ -348,56 +424,135 @@ class PastyApp(QMainWindow):
             self.target_path_input.setText(file_path)
 
     def on_source_text_changed(self, text):
-        self.source_path = text
-        if os.path.exists(text) and os.path.isfile(text):
-            try:
-                with open(text, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Re-init engine with new content
-                self.engine = GhostTyper(content, self.target_path)
+        self.source_path = os.path.expanduser(text)
+        # Wait for the user to stop typing before touching the disk
+        self.load_timer.start()
+        self.check_ready()
+
+    def load_source_file(self):
+        """Validate the current source path and load it off the UI thread"""
+        path = self.source_path
+        self.load_request += 1
+        if not os.path.isfile(path):
+            self.loading = False
+            self.release_engine()
+            self.check_ready()
+            return
+        self.loading = True
+        self.check_ready()
+        task = SourceLoadTask(self.load_request, path, self.source_cache)
+        task.signals.finished.connect(self.on_source_loaded)
+        self.load_pool.start(task)
+
+    def on_source_loaded(self, request_id, key, loaded, error):
+        if request_id != self.load_request:
+            return  # The path changed while this one was loading
+        self.loading = False
+        if error:
+            s = STRINGS[self.current_language]
+            print(f"{s['failed_read']}: {error}")
+            self.release_engine()
+        elif key != self.engine_key:
+            content, keyplan = loaded
+            # Pick up where this source was left last time (if the file is unchanged)
+            recent = self.settings.recent_source(key)
+            strategy = recent["chunk_strategy"] if recent else self.chunk_strategy
+            index = min(recent["content_index"], len(content)) if recent else 0
+            if self.engine and self.engine.chunk_strategy != strategy:
+                self.release_engine()
+            if self.engine:
+                self.remember_source()
+                # Hot-swap the source; the shared keyboard hook stays installed
+                self.engine.load(content, keyplan=keyplan, content_index=index)
+            else:
+                self.engine = GhostTyper(content, self.target_path, keyplan=keyplan,
+                                         auto_wpm=self.auto_wpm, chunk_strategy=strategy,
+                                         adaptive=bool(self.adaptive_rate),
+                                         target_rate=self.adaptive_rate or ADAPTIVE_TARGET_RATE,
+                                         content_index=index)
+                self.engine_signals.attach(self.engine)
                 self.engine.start()
-                self.check_ready()
-            except:
-                pass
+            self.engine_key = key
+            self.preview.set_engine(self.engine)
+            if recent and recent["target"] and not self.target_path:
+                self.target_path_input.setText(recent["target"])
         self.check_ready()
 
+    def release_engine(self):
+        """Stop the live engine (detaching it from the shared keyboard hook), if any"""
+        if self.engine:
+            self.remember_source()
+            self.preview.set_engine(None)
+            self.engine.stop()
+        self.engine = None
+        self.engine_key = None
+
     def on_target_text_changed(self, text):
         self.target_path = text
         if self.engine:
             self.engine.target_path = text
+            self.remember_source()
         self.check_ready()
 
     def check_ready(self):
         s = STRINGS[self.current_language]
+        if self.loading or self.load_timer.isActive():
+            self.start_btn.setEnabled(False)
+            self.start_btn.setText(s['loading'])
+            return
         # Allow typing if source file exists and engine is ready
-        source_valid = self.source_path and os.path.exists(self.source_path) and os.path.isfile(self.source_path)
+        source_valid = self.source_path and os.path.isfile(self.source_path)
         
         if source_valid and self.engine:
             self.start_btn.setEnabled(True)
             self.start_btn.setText(s['hold_to_start'])
-            self.start_btn.setStyleSheet(self.start_btn_style_normal)
         else:
             self.start_btn.setEnabled(False)
             self.start_btn.setText(s['ready'])
-            self.start_btn.setStyleSheet(self.start_btn_style_disabled)
 
     def on_press_start(self):
         if self.start_btn.isEnabled() and self.engine:
             s = STRINGS[self.current_language]
             self.engine.set_recording(True)
             self.start_btn.setText(s['pasting'])
-            self.rec_label.setStyleSheet(f"font-size: 14px; font-weight: bold; color: {self.rec_color_style};")
 
     def on_release_start(self):
         if self.engine:
             s = STRINGS[self.current_language]
             self.engine.set_recording(False)
+            self.remember_source()
             self.start_btn.setText(s['hold_to_start'])
-            self.rec_label.setStyleSheet("font-size: 14px; font-weight: bold; color: transparent;")
+
+    def on_engine_progress(self, index, total):
+        # Coalesced by the bridge: at most BRIDGE_FPS updates a second
+        if self.engine and self.engine.is_recording and total:
+            s = STRINGS[self.current_language]
+            text = f"{s['rec']} {index * 100 // total}%"
+            self.rec_label.setText(f"{text}  {self.rate_text}" if self.rate_text else text)
+
+    def on_engine_rate(self, state):
+        # Adaptive chunking only; shown with the next progress update
+        s = STRINGS[self.current_language]
+        self.rate_text = f"{state['effective_rate']:g} {s['chars_per_sec']}"
+
+    def on_engine_error(self, message):
+        s = STRINGS[self.current_language]
+        print(f"{s['error']}: {message}")
+
+    def set_rec_indicator(self, recording):
+        if not recording:
+            self.rate_text = ""
+            self.rec_label.setText(STRINGS[self.current_language]['rec'])
+        # Dynamic property selectors only re-match after a re-polish
+        self.rec_label.setProperty("recording", recording)
+        style = self.rec_label.style()
+        style.unpolish(self.rec_label)
+        style.polish(self.rec_label)
 
     # Cleanup on close
     def closeEvent(self, event):
-        if self.engine:
-            self.engine.stop()
+        self.load_timer.stop()
+        self.load_request += 1  # Drop any load still in flight
+        self.release_engine()
+        self.settings.close()
         event.accept()
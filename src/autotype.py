@@ -0,0 +1,165 @@
+"""
+Pasty (페이스티) - Auto-type Mode (timed playback without physical keypresses)
+"""
+
+import time
+import random
+import threading
+from array import array
+
+from src.config import (AUTOTYPE_DISTRIBUTION, AUTOTYPE_SIGMA, AUTOTYPE_CLASS_WEIGHTS,
+                        AUTOTYPE_PAUSES, AUTOTYPE_BATCH, AUTOTYPE_SPIN_S, AUTOTYPE_MAX_LAG_S)
+from src.metrics import LatencyHistogram
+
+DISTRIBUTIONS = ("lognormal", "gamma", "constant")
+
+_PUNCT = frozenset(".,!?;:。、，！？")
+
+
+def char_class(ch):
+    if ch in "\r\n":
+        return "newline"
+    if ch.isspace():
+        return "space"
+    if ch in _PUNCT:
+        return "punct"
+    return "char"
+
+
+class TimingSchedule:
+    """
+    Human-ish inter-key delays. Unit-mean random factors are drawn ahead of time in
+    batches (array('d')), so playback only indexes into a buffer; per-class means and
+    pauses after punctuation/newlines shape the cadence around the target WPM.
+    """
+
+    def __init__(self, wpm, distribution=AUTOTYPE_DISTRIBUTION, sigma=AUTOTYPE_SIGMA,
+                 class_weights=AUTOTYPE_CLASS_WEIGHTS, pauses=AUTOTYPE_PAUSES,
+                 batch=AUTOTYPE_BATCH, seed=None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown delay distribution: {distribution}")
+        if wpm <= 0:
+            raise ValueError("wpm must be positive")
+        # 1 word = 5 chars
+        self.interval = 60.0 / (wpm * 5)
+        self.distribution = distribution
+        self.sigma = sigma
+        self.class_weights = class_weights
+        self.pauses = pauses
+        self.batch = batch
+        self.rng = random.Random(seed)
+        self.factors = array('d')
+        self.pos = 0
+
+    def _refill(self):
+        """Draw the next batch of unit-mean factors"""
+        rng, sigma, n = self.rng, self.sigma, self.batch
+        if self.distribution == "lognormal":
+            mu = -sigma * sigma / 2  # E[lognormal] = 1
+            self.factors = array('d', [rng.lognormvariate(mu, sigma) for _ in range(n)])
+        elif self.distribution == "gamma":
+            shape = 1.0 / (sigma * sigma)
+            self.factors = array('d', [rng.gammavariate(shape, 1.0 / shape) for _ in range(n)])
+        else:
+            self.factors = array('d', [1.0]) * n
+        self.pos = 0
+
+    def _factor(self):
+        if self.pos >= len(self.factors):
+            self._refill()
+        f = self.factors[self.pos]
+        self.pos += 1
+        return f
+
+    def delay_after(self, chars):
+        """Seconds to wait after typing `chars` before the next chunk"""
+        total = 0.0
+        for ch in chars:
+            cls = char_class(ch)
+            total += self.interval * self.class_weights.get(cls, 1.0) * self._factor()
+            pause = self.pauses.get(cls)
+            if pause:
+                total += pause * self._factor()
+        return total
+
+
+class AutoTyper:
+    """
+    Drives an engine's injection on a monotonic-clock schedule.
+
+    Deadlines are absolute (start + sum of delays), so sleep overshoot never
+    accumulates; the last AUTOTYPE_SPIN_S before each deadline is busy-waited for
+    sub-millisecond accuracy. If playback falls more than AUTOTYPE_MAX_LAG_S behind
+    (e.g. the machine stalled) the schedule re-anchors instead of bursting to catch up.
+    """
+
+    def __init__(self, inject, schedule, spin=AUTOTYPE_SPIN_S, max_lag=AUTOTYPE_MAX_LAG_S):
+        # Callable queuing the next chunk: returns its text, "" if it was refused
+        # (injector backpressure; retried one interval later) or None at the end
+        self.inject = inject
+        self.schedule = schedule
+        self.spin = spin
+        self.max_lag = max_lag
+        self.jitter = LatencyHistogram()  # Lateness of each injection vs its deadline
+        self.running = threading.Event()
+        self.stopped = threading.Event()  # Set by stop(); also cuts a sleep toward a deadline short
+        self.thread = None
+
+    def resume(self):
+        """Start (or continue) typing"""
+        if self.thread and self.stopped.is_set():
+            # A stop() that timed out: let that thread finish before starting another
+            self.thread.join()
+            self.thread = None
+        if not self.thread:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._run, name="pasty-autotype", daemon=True)
+            self.thread.start()
+        self.running.set()
+
+    def pause(self):
+        self.running.clear()
+
+    def stop(self):
+        self.stopped.set()
+        self.running.set()  # Wake a paused thread so it can exit
+        if self.thread:
+            self.thread.join(1.0)
+            # Only forget the thread once it has exited (it may be inside inject())
+            if not self.thread.is_alive():
+                self.thread = None
+        self.running.clear()
+
+    def _wait_until(self, deadline):
+        clock = time.perf_counter
+        remaining = deadline - clock()
+        if remaining > self.spin and self.stopped.wait(remaining - self.spin):
+            return
+        while clock() < deadline:
+            pass
+
+    def _run(self):
+        clock = time.perf_counter
+        deadline = None
+        while True:
+            if not self.running.is_set():
+                if self.stopped.is_set():
+                    return
+                self.running.wait()
+                deadline = None  # Re-anchor after a pause
+            if self.stopped.is_set():
+                return
+            now = clock()
+            if deadline is None or now - deadline > self.max_lag:
+                deadline = now
+            else:
+                self._wait_until(deadline)
+                if not self.running.is_set() or self.stopped.is_set():
+                    continue
+            self.jitter.record(max(0.0, clock() - deadline))
+            chars = self.inject()
+            if chars is None:
+                # End of source: idle until paused/resumed or stopped
+                self.running.clear()
+                continue
+            deadline += self.schedule.delay_after(chars) if chars else self.schedule.interval
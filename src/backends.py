@@ -0,0 +1,156 @@
+"""
+Pasty (페이스티) - Keyboard Backends (in-memory stand-in for pynput)
+"""
+
+import enum
+import threading
+
+from src.service import KeyboardService
+
+FAKE_BACKEND = "fake"
+
+# Special keys, named as in pynput.keyboard.Key
+Key = enum.Enum("Key", [
+    "alt", "alt_l", "alt_r", "alt_gr", "backspace", "cmd", "cmd_l", "cmd_r",
+    "ctrl", "ctrl_l", "ctrl_r", "delete", "down", "end", "enter", "esc", "home",
+    "left", "right", "shift", "shift_l", "shift_r", "space", "tab", "up",
+    *(f"f{n}" for n in range(1, 13)),
+])
+
+_KEY_TEXT = {Key.enter: "\n", Key.tab: "\t", Key.space: " "}
+_SHIFT = (Key.shift, Key.shift_l, Key.shift_r)
+
+
+class KeyCode:
+    """A printable key"""
+
+    __slots__ = ("char",)
+
+    def __init__(self, char=None):
+        self.char = char
+
+    @classmethod
+    def from_char(cls, char):
+        return cls(char)
+
+    def __eq__(self, other):
+        return isinstance(other, KeyCode) and other.char == self.char
+
+    def __hash__(self):
+        return hash(self.char)
+
+    def __repr__(self):
+        return repr(self.char)
+
+
+class FakeController:
+    """Renders synthetic key events into the keyboard's text buffer"""
+
+    def __init__(self, keyboard):
+        self.keyboard = keyboard
+        self.shift = False
+
+    def press(self, key):
+        kb = self.keyboard
+        if key in _SHIFT:
+            self.shift = True
+        elif key is Key.backspace:
+            with kb.lock:
+                if kb.output:
+                    kb.output.pop()
+        elif key in _KEY_TEXT:
+            kb.emit(_KEY_TEXT[key])
+        elif isinstance(key, KeyCode) and key.char:
+            kb.emit(key.char.upper() if self.shift else key.char)
+        # Real hooks see our own keystrokes too, flagged as injected
+        kb.dispatch(key, pressed=True, injected=True)
+
+    def release(self, key):
+        if key in _SHIFT:
+            self.shift = False
+        self.keyboard.dispatch(key, pressed=False, injected=True)
+
+    def type(self, text):
+        self.keyboard.emit(text)
+
+
+class FakeListener:
+    def __init__(self, keyboard, on_press=None, on_release=None):
+        self.keyboard = keyboard
+        self.on_press = on_press
+        self.on_release = on_release
+
+    def start(self):
+        with self.keyboard.lock:
+            self.keyboard.listeners.append(self)
+
+    def stop(self):
+        with self.keyboard.lock:
+            if self in self.keyboard.listeners:
+                self.keyboard.listeners.remove(self)
+
+
+class FakeKeyboard:
+    """
+    Module-like replacement for pynput.keyboard (Key, KeyCode, Controller, Listener).
+    Typed output accumulates in memory (`text`), and tap()/press() feed "physical"
+    key events to the listeners, so engines can run headless and in tests.
+    With record=False output is discarded (a null backend).
+    """
+
+    Key = Key
+    KeyCode = KeyCode
+
+    def __init__(self, record=True):
+        self.record = record
+        self.output = []  # One entry per emitted char
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def Controller(self):
+        return FakeController(self)
+
+    def Listener(self, on_press=None, on_release=None):
+        return FakeListener(self, on_press, on_release)
+
+    @property
+    def text(self):
+        with self.lock:
+            return "".join(self.output)
+
+    def clear(self):
+        with self.lock:
+            self.output.clear()
+
+    def emit(self, text):
+        if self.record:
+            with self.lock:
+                self.output.extend(text)
+
+    def dispatch(self, key, pressed=True, injected=False):
+        with self.lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            callback = listener.on_press if pressed else listener.on_release
+            if callback:
+                callback(key, injected)
+
+    def press(self, key):
+        """Simulate a physical key press and release (seen by the listeners only)"""
+        if key is Key.backspace:
+            # ...except Backspace, which also erases a char in the focused app
+            with self.lock:
+                if self.output:
+                    self.output.pop()
+        self.dispatch(key, pressed=True)
+        self.dispatch(key, pressed=False)
+
+    def tap(self, chars):
+        """Simulate physically pressing each char of `chars`"""
+        for ch in chars:
+            self.press(KeyCode.from_char(ch))
+
+
+def fake_service(record=True):
+    """A KeyboardService on a fresh FakeKeyboard"""
+    return KeyboardService(FakeKeyboard(record), FAKE_BACKEND)
@@ -0,0 +1,85 @@
+"""
+Pasty (페이스티) - Engine Event Bridge (engine threads -> UI thread)
+"""
+
+import itertools
+
+from src.config import BRIDGE_RING_SIZE
+
+
+class EventRing:
+    """
+    Fixed-size multi-producer, single-consumer ring without locks.
+
+    Producers claim a sequence number from an itertools.count (atomic under the
+    GIL) and store (seq, event) in its slot, so put() never waits on the consumer.
+    When producers lap the consumer the oldest events are overwritten; drain()
+    notices from the sequence numbers and counts them in `dropped`.
+    """
+
+    def __init__(self, size=BRIDGE_RING_SIZE):
+        self.size = size
+        self.slots = [None] * size
+        self.claim = itertools.count()
+        self.read = 0     # Next sequence number the consumer expects
+        self.dropped = 0  # Events overwritten before they were drained
+
+    def put(self, event):
+        seq = next(self.claim)
+        self.slots[seq % self.size] = (seq, event)
+
+    def drain(self):
+        """Every event posted since the last drain, oldest first (consumer thread only)"""
+        events = []
+        slots, size = self.slots, self.size
+        while True:
+            slot = slots[self.read % size]
+            if slot is None or slot[0] < self.read:
+                return events  # Not written yet
+            seq, event = slot
+            if seq > self.read:
+                # Lapped: only the last `size` sequence numbers can still be intact
+                oldest = seq - size + 1
+                self.dropped += oldest - self.read
+                self.read = oldest
+                continue
+            events.append(event)
+            self.read += 1
+
+
+class EventBridge:
+    """
+    Engine side of the engine -> UI bridge. post() is an on_status_change
+    callback that only stores the event, so engine threads never touch the UI.
+    collect() (UI thread) coalesces what arrived since the last call: every
+    recording transition (repeats collapsed) and error, but only the latest
+    progress and adaptive-rate state.
+    """
+
+    def __init__(self, size=BRIDGE_RING_SIZE):
+        self.ring = EventRing(size)
+        self.recording = None  # Last recording state delivered
+
+    @property
+    def dropped(self):
+        return self.ring.dropped
+
+    def post(self, status, detail=None):
+        self.ring.put((status, detail))
+
+    def collect(self):
+        """(recording transitions, error messages, latest progress or None, latest rate or None)"""
+        transitions, errors = [], []
+        progress = rate = None
+        for status, detail in self.ring.drain():
+            if isinstance(status, bool):
+                if status != self.recording:
+                    self.recording = status
+                    transitions.append(status)
+            elif status == "error":
+                errors.append(detail)
+            elif status == "progress":
+                progress = detail
+            elif status == "rate":
+                rate = detail
+        return transitions, errors, progress, rate
@@ -0,0 +1,299 @@
+"""
+Pasty (페이스티) - Chunk Planning
+"""
+
+import re
+import random
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import (CHUNK_STRATEGY, CHUNK_MIN, CHUNK_MAX, CHUNK_SEED,
+                        PLAN_BLOCK_CHARS, PLAN_MAX_CHUNK)
+
+STRATEGIES = ("fixed", "random", "word", "line")
+
+# Chars that never start a new grapheme cluster: combining marks, variation
+# selectors, emoji modifiers, tag characters, ZWNJ/ZWJ
+_EXTEND = re.compile(
+    "[\u0300-\u036F\u0483-\u0489\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7"
+    "\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E4\u0900-\u0903"
+    "\u093A-\u094F\u0951-\u0957\u0E31\u0E34-\u0E3A\u0E47-\u0E4E"
+    "\u1AB0-\u1AFF\u1DC0-\u1DFF\u200C\u200D\u20D0-\u20FF\u302A-\u302F\u3099\u309A"
+    "\uFE00-\uFE0F\uFE20-\uFE2F\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F\U000E0100-\U000E01EF]"
+)
+_WORD = re.compile(r"\S+\s*|\s+")
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|[\r\n])?")
+
+# Chunks recorded between position checkpoints (bounds the scan in seek)
+_CHECKPOINT_EVERY = 1024
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def planner():
+    """The one thread that plans blocks ahead for every prefetching ChunkPlan"""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pasty-planner")
+        return _planner
+
+
+def _hangul_class(ch):
+    """Return the Hangul jamo class of a char: L, V, T, LV, LVT or None"""
+    o = ord(ch)
+    if 0x1100 <= o <= 0x115F or 0xA960 <= o <= 0xA97C:
+        return "L"
+    if 0x1160 <= o <= 0x11A7 or 0xD7B0 <= o <= 0xD7C6:
+        return "V"
+    if 0x11A8 <= o <= 0x11FF or 0xD7CB <= o <= 0xD7FB:
+        return "T"
+    if 0xAC00 <= o <= 0xD7A3:
+        return "LV" if (o - 0xAC00) % 28 == 0 else "LVT"
+    return None
+
+
+def _is_regional(ch):
+    return 0x1F1E6 <= ord(ch) <= 0x1F1FF
+
+
+def is_boundary(text, pos):
+    """True if a chunk may be cut between text[pos-1] and text[pos]"""
+    if pos <= 0 or pos >= len(text):
+        return True
+    prev, cur = text[pos - 1], text[pos]
+    if cur < "\u0300" and prev < "\u0300" and prev != "\r":
+        # Fast path: nothing below U+0300 joins with its neighbour except CRLF
+        return True
+    if prev == "\r":
+        return cur != "\n"
+    if cur in "\r\n" or prev == "\n":
+        return True
+    if _EXTEND.match(cur) or prev == "\u200d":
+        return False
+    cur_class = _hangul_class(cur)
+    if cur_class:
+        prev_class = _hangul_class(prev)
+        if prev_class == "L":
+            return cur_class not in ("L", "V", "LV", "LVT")
+        if prev_class in ("V", "LV"):
+            return cur_class not in ("V", "T")
+        if prev_class in ("T", "LVT"):
+            return cur_class != "T"
+        return True
+    if _is_regional(prev) and _is_regional(cur):
+        # Flags pair up: break only after an even run of regional indicators
+        run = 0
+        i = pos - 1
+        while i >= 0 and _is_regional(text[i]):
+            run += 1
+            i -= 1
+        return run % 2 == 0
+    return True
+
+
+def grapheme_start(source, index):
+    """The grapheme boundary at or before `index`"""
+    if index <= 0:
+        return 0
+    if index >= len(source):
+        return len(source)
+    lo = max(0, index - PLAN_MAX_CHUNK)
+    text = source[lo:index + 1]
+    pos = index - lo
+    while pos > 0 and not is_boundary(text, pos):
+        pos -= 1
+    return lo + pos
+
+
+class ChunkPlan:
+    """
+    Precomputed chunk lengths for a source, never cutting inside a grapheme cluster.
+
+    The plan is built in blocks of PLAN_BLOCK_CHARS as the read position approaches the
+    end of what is planned, so huge sources cost nothing up front. Looking up the chunk
+    that starts at the current position is O(1) for sequential typing.
+
+    Planning starts at `base` (snapped back to a grapheme boundary). A position behind
+    the plan, or more than a block past it, restarts the plan there instead of
+    planning everything in between, so resuming or seeking anywhere costs one block.
+
+    With prefetch=True the next block is planned on the planner thread once the
+    position is within half a block of the end of the plan, so sequential typing
+    never draws a size or scans for a boundary on the caller's thread. Blocks are
+    the same whichever thread plans them.
+    """
+
+    def __init__(self, source, strategy=CHUNK_STRATEGY, min_chars=CHUNK_MIN,
+                 max_chars=None, seed=CHUNK_SEED, base=0, prefetch=False):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown chunk strategy: {strategy}")
+        if max_chars is None:
+            # Word/line chunks are only capped by the hard limit unless asked otherwise
+            max_chars = CHUNK_MAX if strategy in ("fixed", "random") else PLAN_MAX_CHUNK
+        if not 1 <= min_chars <= max_chars <= PLAN_MAX_CHUNK:
+            raise ValueError(f"Invalid chunk range: {min_chars}-{max_chars}")
+        self.source = source
+        self.strategy = strategy
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.seed = seed
+        self.total = len(source) if source else 0
+        self.prefetch = prefetch
+        self.prefetching = False
+        # Guards the planned arrays and planning state against the planner thread
+        self.lock = threading.RLock()
+        self._restart(base)
+
+    @property
+    def complete(self):
+        return self.planned_end >= self.total
+
+    def length_at(self, index):
+        """Length of the chunk starting at `index` (0 at the end of the source)"""
+        if index >= self.total:
+            return 0
+        if index != self.cursor_pos:
+            if self.cursor < len(self.lengths) and index == self.cursor_pos + self.lengths[self.cursor]:
+                # Sequential typing: step to the next chunk
+                self.cursor_pos = index
+                self.cursor += 1
+            else:
+                self.seek(index)
+        while self.cursor >= len(self.lengths) and not self.complete:
+            self._extend()  # Typed past the plan before the planner caught up
+        if self.prefetch:
+            self._want_ahead(index)
+        if self.cursor >= len(self.lengths):
+            return 0
+        # Positions that fall inside a planned chunk get its remainder
+        return self.lengths[self.cursor] - (index - self.cursor_pos)
+
+    def seek(self, index):
+        """Move the cursor to the chunk containing `index`"""
+        if index < self.base or (not self.complete and index >= self.planned_end + PLAN_BLOCK_CHARS):
+            self._restart(index)
+        while index >= self.planned_end and not self.complete:
+            self._extend()
+        # Checkpoints are ascending; find the last one at or before index
+        lo, hi = 0, len(self.checkpoints) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.checkpoints[mid] <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        chunk = lo * _CHECKPOINT_EVERY
+        pos = self.checkpoints[lo]
+        while chunk < len(self.lengths) and pos + self.lengths[chunk] <= index:
+            pos += self.lengths[chunk]
+            chunk += 1
+        self.cursor = chunk
+        self.cursor_pos = pos
+
+    def chunk_start(self, chunk):
+        """Source offset where chunk number `chunk` starts"""
+        base = chunk // _CHECKPOINT_EVERY
+        pos = self.checkpoints[base]
+        for k in range(base * _CHECKPOINT_EVERY, chunk):
+            pos += self.lengths[k]
+        return pos
+
+    def _restart(self, base):
+        """Drop the plan and plan afresh from the grapheme boundary at or before `base`"""
+        base = grapheme_start(self.source, min(base, self.total)) if base > 0 and self.total else 0
+        with self.lock:
+            # Random sizes only depend on the seed and where planning started
+            self.rng = random.Random(self.seed if self.seed is None or not base else f"{self.seed}@{base}")
+            self.base = base
+            self.lengths = array('H')      # Length of every planned chunk from base
+            self.checkpoints = array('Q')  # Start of chunk k * _CHECKPOINT_EVERY
+            self.planned_end = base        # Source offset where planning stopped
+            self.pending = 0               # Drawn size carried over a block edge
+            self.cursor = 0                # Chunk number at cursor_pos
+            self.cursor_pos = base
+            self._extend()
+
+    def _want_ahead(self, index):
+        """Plan the next block on the planner thread once `index` is half a block from the end"""
+        if self.prefetching or self.complete or self.planned_end - index > PLAN_BLOCK_CHARS // 2:
+            return
+        self.prefetching = True
+        planner().submit(self._prefetch)
+
+    def _prefetch(self):
+        # Planner thread: plan from a snapshot, then commit unless the plan moved meanwhile
+        try:
+            with self.lock:
+                lengths, start, pending = self.lengths, self.planned_end, self.pending
+                rng = random.Random()
+                rng.setstate(self.rng.getstate())
+            block = self._plan_block(start, pending, rng)
+            with self.lock:
+                if self.lengths is lengths and self.planned_end == start:
+                    self._commit(start, *block)
+                    self.rng = rng
+        finally:
+            self.prefetching = False
+
+    def _extend(self):
+        """Plan the next block of the source, here and now"""
+        with self.lock:
+            if self.planned_end < self.total:
+                self._commit(self.planned_end, *self._plan_block(self.planned_end, self.pending, self.rng))
+
+    def _plan_block(self, start, pending, rng):
+        """(chunk lengths, planned end, carried size) for the block at `start`"""
+        text = self.source[start:start + PLAN_BLOCK_CHARS]
+        final = start + len(text) >= self.total
+        lengths = []
+        pos = 0
+        while pos < len(text):
+            cut, pending = self._next_cut(text, pos, final, pending, rng)
+            if cut is None:
+                break
+            lengths.append(cut - pos)
+            pos = cut
+        return lengths, start + pos, pending
+
+    def _commit(self, start, lengths, end, pending):
+        # Caller holds self.lock
+        pos = start
+        for length in lengths:
+            if len(self.lengths) % _CHECKPOINT_EVERY == 0:
+                self.checkpoints.append(pos)
+            self.lengths.append(length)
+            pos += length
+        self.pending = pending
+        self.planned_end = end
+
+    def _next_cut(self, text, pos, final, pending, rng):
+        """(end offset of the chunk starting at `pos` or None if more text is needed, carried size)"""
+        end = len(text)
+        if self.strategy == "fixed":
+            cut = pos + self.max_chars
+        elif self.strategy == "random":
+            # Drawn once per chunk; kept across a block edge so the sequence only depends on the seed
+            if not pending:
+                pending = rng.randint(self.min_chars, self.max_chars)
+            cut = pos + pending
+        else:
+            # Whole words/lines, merged up to min_chars and split past max_chars
+            pattern = _WORD if self.strategy == "word" else _LINE
+            cut = pos
+            while cut < end and cut - pos < self.min_chars:
+                cut = pattern.match(text, cut).end()
+            cut = min(cut, pos + self.max_chars)
+        if cut >= end:
+            if not final:
+                return None, pending
+            cut = end
+        # Never split a grapheme cluster; grow the chunk to the next boundary
+        while cut < end and not is_boundary(text, cut):
+            cut += 1
+        cut = min(cut, pos + PLAN_MAX_CHUNK)
+        if cut >= end and not final:
+            return None, pending
+        return cut, 0
@@ -6,6 +6,115 @@ Pasty (페이스티) - Configuration & Constants
 APP_NAME = "Pasty"
 VERSION = "v0.7.0"
 
+# Startup - cold import budgets checked by `python -m src.startup`
+IMPORT_BUDGET_MS = {
+    "src.engine": 150,
+    "main_cli": 400,
+}
+
+# CLI
+CLI_REFRESH_FPS = 8  # Dashboard frame cap; keeps rendering off the listener's back
+
+# Engine - Injection
+INJECT_QUEUE_SIZE = 64        # Max chunks waiting to be typed
+INJECT_BACKPRESSURE = "block" # "block" (wait, then refuse) or "reject" (refuse immediately)
+INJECT_BLOCK_TIMEOUT = 0.05   # Seconds the listener may wait for queue space
+INJECT_MODE = "thread"        # "thread", or "process": a child process owns the keyboard controller
+
+# Engine - Out-of-process Injection (INJECT_MODE = "process", see src.procinject)
+PROC_INJECT_SLOT_BYTES = 4096  # Shared-memory ring slot; longer chunks span several slots
+PROC_INJECT_POLL_S = 0.1       # Liveness check interval on both sides (bounds the restart delay)
+PROC_INJECT_MAX_RESTARTS = 5   # Child crashes tolerated per engine run before typing stops
+
+# Engine - Target File
+WRITER_FLUSH_CHARS = 256       # Flush once this many chars are buffered
+WRITER_FLUSH_INTERVAL_MS = 250 # ...or once the oldest buffered chars are this old
+WRITER_FSYNC_ON_STOP = False   # fsync the target when the session stops
+
+# Engine - Source Loading
+SOURCE_MMAP_THRESHOLD = 1 << 20 # Files at least this big (bytes) are memory-mapped
+SOURCE_INDEX_STRIDE = 4096      # Chars between byte-offset index entries
+SOURCE_WINDOW_CHARS = 65536     # Decoded chars kept in memory around the read position
+SOURCE_CACHE_SIZE = 4           # Recently loaded sources kept for instant switching
+SOURCE_DEBOUNCE_MS = 300        # GUI waits this long after the last path edit before loading
+
+# Engine - Chunk Planning
+CHUNK_STRATEGY = "random" # "fixed", "random", "word" or "line"
+CHUNK_MIN = 1             # Smallest chunk (random range / word+line merging)
+CHUNK_MAX = 5             # Largest chunk for fixed/random; fixed always uses this
+CHUNK_SEED = None         # Set for reproducible chunking
+PLAN_BLOCK_CHARS = 16384  # Source chars planned per step (> 2 * PLAN_MAX_CHUNK)
+PLAN_MAX_CHUNK = 4096     # Hard cap on a single chunk
+
+# Engine - Adaptive Chunking (replaces the planned sizes when enabled)
+ADAPTIVE_ENABLED = False
+ADAPTIVE_TARGET_RATE = 15.0     # Output chars/sec to aim for
+ADAPTIVE_MIN_CHARS = 1
+ADAPTIVE_MAX_CHARS = 12
+ADAPTIVE_SMOOTHING = 0.3        # EWMA weight of the newest sample
+ADAPTIVE_MAX_LATENCY = 0.05     # Injection latency (s) treated as congestion
+ADAPTIVE_MAX_BACKLOG = 4        # Queued chunks treated as congestion
+ADAPTIVE_RECOVERY = 0.1         # Scale regained per uncongested press
+ADAPTIVE_REPORT_INTERVAL = 0.5  # Seconds between "rate" status callbacks
+
+# Engine - Keystroke Plans
+KEYPLAN_ENABLED = True                 # Compile sources to cached keystroke plans
+KEYPLAN_CACHE_MAX_BYTES = 256 << 20    # Cache directory size before LRU eviction
+
+# Engine - Auto-type (timed playback, no physical keypresses)
+AUTOTYPE_WPM = 80                # Default target speed (1 word = 5 chars)
+AUTOTYPE_DISTRIBUTION = "lognormal"  # "lognormal", "gamma" or "constant"
+AUTOTYPE_SIGMA = 0.35            # Spread of the per-key delay factor
+AUTOTYPE_CLASS_WEIGHTS = {"char": 1.0, "space": 1.15, "punct": 1.3, "newline": 1.5}
+AUTOTYPE_PAUSES = {"punct": 0.18, "newline": 0.45}  # Mean extra pause (s) after these
+AUTOTYPE_BATCH = 4096            # Delay factors drawn per batch
+AUTOTYPE_SPIN_S = 0.002          # Busy-wait this close to a deadline instead of sleeping
+AUTOTYPE_MAX_LAG_S = 0.25        # Re-anchor the schedule when this far behind
+
+# Engine - asyncio API
+AIO_EVENT_QUEUE_SIZE = 256  # Events buffered per events() consumer before the oldest is dropped
+
+# Engine - Rewind (Backspace undoes the last chunk)
+REWIND_KEY = "f8"     # Key (pynput Key name) that undoes REWIND_CHUNKS chunks; None disables
+REWIND_CHUNKS = 5
+REWIND_HISTORY = 4096  # Chunks remembered per source
+
+# Engine - Target Verification
+VERIFY_INDEX_STRIDE = 4096  # Source chars per prefix-hash checkpoint (bounds each check)
+VERIFY_TAIL_BYTES = 4096    # Last written bytes compared against the target's tail
+VERIFY_ON_STOP = True       # Check the target when the engine stops
+
+# Engine - Session Recording (opt-in binary event log, see src.recorder)
+RECORDER_BUFFER_RECORDS = 4096  # Events packed per buffer before the writer thread appends it
+
+# GUI - Themes
+THEME_MODES = ("system", "light", "dark")  # toggle_theme cycles in this order; the first is the default
+
+# GUI - Settings
+SETTINGS_FILE = "settings.json"  # Inside the per-user config directory
+SETTINGS_SAVE_DELAY_MS = 500     # Changes are written once they have been quiet this long
+SETTINGS_RECENT_SOURCES = 20     # Sources whose position/target are remembered
+
+# GUI - Source Preview
+PREVIEW_ROWS = 6                # Visible rows
+PREVIEW_CONTEXT_ROWS = 2        # Rows of already-typed text kept above the current one
+PREVIEW_MAX_LINE = 256          # Longer lines wrap here; bounds every lookup
+PREVIEW_FPS = 15                # Repaint cap; progress between frames is coalesced
+PREVIEW_SCAN_CHARS = 1 << 18    # Chars indexed for line numbers per frame
+
+# GUI - Engine Event Bridge
+BRIDGE_RING_SIZE = 1024  # Engine events held between UI drains; older ones are overwritten
+BRIDGE_FPS = 30          # UI drains (and emits coalesced signals) at this rate
+
+# Daemon (pastyd)
+DAEMON_SOCKET_NAME = "pastyd.sock"  # Inside the per-user runtime directory
+DAEMON_MAX_REQUEST = 1 << 16        # Bytes per request line
+DAEMON_CLIENT_TIMEOUT = 5.0         # Seconds a client waits for a reply
+
+# Engine - Metrics
+METRICS_RATE_WINDOW = 6      # Seconds kept for chars/sec (last one is still filling)
+METRICS_DUMP_INTERVAL = 5.0  # Seconds between JSON-lines stats dumps
+
 # Language Strings
 STRINGS = {
     "ko": {
@@ -18,10 +127,20 @@ STRINGS = {
         "hold_to_start": "누르고 있으면 시작",
         "pasting": "복사 중...",
         "rec": "● REC",
+        "chars_per_sec": "자/초",
         "error": "오류",
         "failed_read": "파일 읽기 실패",
         "copyright": "Rheehose (Rhee Creative) 2008-2026",
-        "not_selected": ""
+        "not_selected": "",
+        "loading": "불러오는 중...",
+        "paused": "일시정지",
+        "cli_controls": "[Ctrl+S] 시작/정지   [Ctrl+Q] 종료",
+        "position": "위치",
+        "speed": "속도",
+        "latency": "지연",
+        "jitter": "타이밍 오차",
+        "adaptive": "적응형",
+        "eta": "남은 시간"
     },
     "en": {
         "title": "PASTY",
@@ -33,9 +152,19 @@ STRINGS = {
         "hold_to_start": "HOLD TO START",
         "pasting": "PASTING...",
         "rec": "● REC",
+        "chars_per_sec": "chars/s",
         "error": "Error",
         "failed_read": "Failed to read file",
         "copyright": "Rheehose (Rhee Creative) 2008-2026",
-        "not_selected": ""
+        "not_selected": "",
+        "loading": "LOADING...",
+        "paused": "PAUSED",
+        "cli_controls": "[Ctrl+S] start/stop   [Ctrl+Q] quit",
+        "position": "Position",
+        "speed": "Speed",
+        "latency": "Latency",
+        "jitter": "Timing jitter",
+        "adaptive": "Adaptive",
+        "eta": "ETA"
     }
 }
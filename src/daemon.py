@@ -0,0 +1,329 @@
+"""
+Pasty (페이스티) - Background Daemon & Control Protocol
+
+One JSON object per line in each direction over a Unix domain socket:
+    request   {"op": "...", "session": "name", ...}
+    response  {"ok": true, ...}  or  {"ok": false, "error": "..."}
+
+Ops (session defaults to "default"):
+    load      source, [target], [wpm], [rate]  create the session or hot-swap its source
+              (a different wpm/rate replaces the session's engine, keeping its target)
+    start     recording on
+    stop      recording off
+    status    one session, or every session when "session" is omitted
+    stats     engine stats plus last_error
+    seek      index (snapped back to a grapheme boundary; chunking restarts there)
+    verify    check the target file against the typed source
+    close     stop and drop the session
+    ping      version and keyboard backend
+    shutdown  stop the daemon
+    press     chars (fake backend only): simulate physical key presses
+    output    (fake backend only): text typed so far
+"""
+
+import os
+import json
+import socket
+import threading
+import socketserver
+from pathlib import Path
+
+from src.config import (VERSION, KEYPLAN_ENABLED, DAEMON_SOCKET_NAME, DAEMON_MAX_REQUEST,
+                        DAEMON_CLIENT_TIMEOUT, ADAPTIVE_TARGET_RATE)
+from src.engine import GhostTyper
+from src.keyplan import load_keyplan
+from src.source import SourceCache, load_source
+from src.paths import user_runtime_dir
+
+DEFAULT_SESSION = "default"
+
+
+def default_socket_path():
+    return user_runtime_dir() / DAEMON_SOCKET_NAME
+
+
+class DaemonError(RuntimeError):
+    """The daemon refused a request"""
+
+
+class DaemonSession:
+    """A named engine hosted by the daemon"""
+
+    __slots__ = ("name", "engine", "source_path", "mode", "last_error")
+
+    def __init__(self, name, engine, source_path, mode):
+        self.name = name
+        self.engine = engine
+        self.source_path = source_path
+        self.mode = mode  # (wpm, rate) the engine was built with
+        self.last_error = None
+        engine.on_status_change = self.on_status_change
+
+    def on_status_change(self, status, detail=None):
+        if status == "error":
+            self.last_error = detail
+
+    def status(self):
+        engine = self.engine
+        return {
+            "session": self.name,
+            "source": self.source_path,
+            "target": engine.target_path,
+            "recording": engine.is_recording,
+            "content_index": engine.content_index,
+            "total_chars": engine.session.total,
+            "last_error": self.last_error,
+        }
+
+
+class PastyDaemon:
+    """
+    Keeps the keyboard hook, loaded sources and their keystroke plans warm,
+    and hosts any number of named GhostTyper sessions on one KeyboardService.
+    """
+
+    def __init__(self, service, socket_path=None):
+        self.service = service
+        self.socket_path = Path(socket_path or default_socket_path())
+        self.sessions = {}
+        self.sources = SourceCache()  # (content, keyplan) by (path, mtime, size)
+        self.lock = threading.Lock()  # Guards the sessions dict
+        self.server = None
+
+    # --- Protocol ---
+
+    def handle(self, request):
+        """Run one request dict and return its response dict"""
+        op = request.get("op")
+        method = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+        if method is None:
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        try:
+            result = method(request)
+        except KeyError as e:
+            return {"ok": False, "error": f"Missing {e}"}
+        except (ValueError, TypeError, OSError) as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, **(result or {})}
+
+    def _session(self, request):
+        name = request.get("session") or DEFAULT_SESSION
+        with self.lock:
+            session = self.sessions.get(name)
+        if session is None:
+            raise ValueError(f"No such session: {name}")
+        return session
+
+    def _load(self, path):
+        key = SourceCache.key_for(path)
+        loaded = self.sources.get(key)
+        if loaded is None:
+            content = load_source(path)
+            keyplan = load_keyplan(content, self.service.backend) if KEYPLAN_ENABLED else None
+            loaded = (content, keyplan)
+            self.sources.put(key, loaded)
+        return loaded
+
+    def op_load(self, request):
+        name = request.get("session") or DEFAULT_SESSION
+        source_path = os.path.abspath(os.path.expanduser(request["source"]))
+        target_path = request.get("target")
+        if target_path:
+            target_path = os.path.abspath(os.path.expanduser(target_path))
+        content, keyplan = self._load(source_path)
+        wpm, rate = mode = (request.get("wpm") or None, request.get("rate") or None)
+        with self.lock:
+            retired = self.sessions.get(name)
+            if retired is not None and retired.mode != mode:
+                # Auto-type and adaptive chunking are fixed per engine: replace it
+                del self.sessions[name]
+            else:
+                retired = None
+        content_index = 0
+        if retired:
+            retired.engine.stop()
+            target_path = target_path or retired.engine.target_path
+            if retired.source_path == source_path:
+                content_index = retired.engine.content_index
+        with self.lock:
+            session = self.sessions.get(name)
+            if session is None:
+                engine = GhostTyper(content, target_path, keyplan=keyplan, service=self.service,
+                                    compile_keys=KEYPLAN_ENABLED, auto_wpm=wpm, adaptive=bool(rate),
+                                    target_rate=rate or ADAPTIVE_TARGET_RATE,
+                                    content_index=content_index)
+                session = self.sessions[name] = DaemonSession(name, engine, source_path, mode)
+                engine.start()
+            else:
+                # Hot swap: the keyboard hook and the engine's threads stay up
+                session.engine.load(content, keyplan=keyplan, target_path=target_path)
+                session.source_path = source_path
+                session.last_error = None
+        return session.status()
+
+    def op_start(self, request):
+        session = self._session(request)
+        session.engine.set_recording(True)
+        return session.status()
+
+    def op_stop(self, request):
+        session = self._session(request)
+        session.engine.set_recording(False)
+        return session.status()
+
+    def op_status(self, request):
+        if request.get("session"):
+            return self._session(request).status()
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return {"sessions": [s.status() for s in sessions]}
+
+    def op_stats(self, request):
+        session = self._session(request)
+        return {**session.engine.stats(), "last_error": session.last_error}
+
+    def op_seek(self, request):
+        session = self._session(request)
+        session.engine.seek(int(request["index"]))
+        return session.status()
+
+    def op_verify(self, request):
+        return self._session(request).engine.verify()
+
+    def op_close(self, request):
+        session = self._session(request)
+        with self.lock:
+            self.sessions.pop(session.name, None)
+        session.engine.stop()
+        return {"session": session.name}
+
+    def op_ping(self, request):
+        return {"version": VERSION, "backend": self.service.backend}
+
+    def op_shutdown(self, request):
+        threading.Thread(target=self.shutdown, name="pasty-shutdown", daemon=True).start()
+        return {}
+
+    def op_press(self, request):
+        keyboard = self._fake_keyboard()
+        keyboard.tap(request["chars"])
+        # Reply once the resulting chunks have been typed
+        with self.lock:
+            engines = [s.engine for s in self.sessions.values()]
+        for engine in engines:
+            engine.injector.queue.join()
+        return {}
+
+    def op_output(self, request):
+        return {"text": self._fake_keyboard().text}
+
+    def _fake_keyboard(self):
+        keyboard = self.service.keyboard
+        if not hasattr(keyboard, "tap"):
+            raise ValueError("Only available with the fake keyboard backend")
+        return keyboard
+
+    # --- Server ---
+
+    def serve(self):
+        """Bind the socket and serve until shutdown()"""
+        path = self.socket_path
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if path.exists():
+            try:
+                DaemonClient(path, timeout=1.0).close()
+            except OSError:
+                path.unlink()  # Stale socket from a daemon that did not exit cleanly
+            else:
+                raise OSError(f"pastyd is already running on {path}")
+        self.server = _Server(str(path), _Handler)
+        self.server.pasty = self
+        os.chmod(path, 0o600)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close_sessions()
+            self.server.server_close()
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """Stop serve() (call from another thread)"""
+        if self.server:
+            self.server.shutdown()
+
+    def close_sessions(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.engine.stop()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.pasty
+        while True:
+            line = self.rfile.readline(DAEMON_MAX_REQUEST + 1)
+            if not line:
+                return
+            if len(line) > DAEMON_MAX_REQUEST:
+                self._reply({"ok": False, "error": "Request too large"})
+                return
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                reply = {"ok": False, "error": f"Bad request: {e}"}
+            else:
+                if isinstance(request, dict):
+                    reply = daemon.handle(request)
+                else:
+                    reply = {"ok": False, "error": "Bad request: expected an object"}
+            self._reply(reply)
+
+    def _reply(self, reply):
+        self.wfile.write(json.dumps(reply, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class DaemonClient:
+    """Blocking connection to a running pastyd; raises OSError if there is none"""
+
+    def __init__(self, socket_path=None, timeout=DAEMON_CLIENT_TIMEOUT):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(str(socket_path or default_socket_path()))
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, op, **args):
+        """Send one request and return the reply; raises DaemonError if it failed"""
+        message = json.dumps({"op": op, **args}, ensure_ascii=False, separators=(",", ":"))
+        self.file.write(message.encode("utf-8") + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise OSError("pastyd closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise DaemonError(reply.get("error", "Request failed"))
+        return reply
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
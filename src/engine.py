@@ -6,70 +6,446 @@ Pasty (페이스티) - Core Typing Engine
 import time
 import random
 import threading
-from pynput import keyboard
+
+from src.config import (INJECT_QUEUE_SIZE, INJECT_BACKPRESSURE, WRITER_FSYNC_ON_STOP,
+                        CHUNK_STRATEGY, CHUNK_MIN, CHUNK_SEED, KEYPLAN_ENABLED,
+                        AUTOTYPE_DISTRIBUTION, VERIFY_ON_STOP, REWIND_KEY, REWIND_CHUNKS,
+                        ADAPTIVE_ENABLED, ADAPTIVE_TARGET_RATE, INJECT_MODE)
+from src.adaptive import ChunkController
+from src.autotype import AutoTyper, TimingSchedule
+from src.chunker import ChunkPlan
+from src.keyplan import load_keyplan
+from src.injector import InjectionWorker
+from src.metrics import EngineMetrics, MetricsDumper
+from src.recorder import (SessionRecorder, INJECT, REFUSED, TYPED, BACKSPACE, REWIND,
+                          RECORDING, SEEK, LOAD)
+from src.verify import PrefixHashIndex, check_target
+from src.writer import TargetWriter
+from src.service import KeyboardService, TypingSession, TypedChunk, PYNPUT_BACKEND
+
 
 class GhostTyper:
-    def __init__(self, source_content, target_path=None):
-        self.source_content = source_content
-        self.target_path = target_path
-        self.content_index = 0
+    """
+    Types `source_content` one chunk per physical keypress, or on its own at
+    `auto_wpm` words per minute when that is set (recording then starts/pauses playback).
+    `source_content` may be a str or any str-like sliceable (e.g. src.source.MappedSource).
+
+    Key events come from a shared KeyboardService, so load() can swap the source
+    (and target) of a running engine without re-hooking the keyboard.
+    """
+
+    def __init__(self, source_content, target_path=None,
+                 queue_size=INJECT_QUEUE_SIZE, backpressure=INJECT_BACKPRESSURE,
+                 fsync_on_stop=WRITER_FSYNC_ON_STOP, chunk_strategy=CHUNK_STRATEGY,
+                 chunk_min=CHUNK_MIN, chunk_max=None, seed=CHUNK_SEED,
+                 compile_keys=KEYPLAN_ENABLED, metrics_path=None, keyplan=None, service=None,
+                 auto_wpm=None, auto_distribution=AUTOTYPE_DISTRIBUTION,
+                 verify_on_stop=VERIFY_ON_STOP, rewind_key=REWIND_KEY, rewind_chunks=REWIND_CHUNKS,
+                 adaptive=ADAPTIVE_ENABLED, target_rate=ADAPTIVE_TARGET_RATE, record_path=None,
+                 inject_mode=INJECT_MODE, content_index=0):
+        self.service = service or KeyboardService.shared()
+        self.kb_controller = self.service.controller
+        self.modifier_keys = self.service.modifier_keys
+        self.chord_keys = self.service.chord_keys
+        # Backspace undoes the last chunk; the rewind key undoes `rewind_chunks` of them
+        key_names = self.service.keyboard.Key
+        self.backspace_key = key_names.backspace
+        self.rewind_key = getattr(key_names, rewind_key, None) if rewind_key else None
+        self.rewind_chunks = rewind_chunks
+        # Adaptive sizing: the controller picks chars per press (keypress-driven mode only)
+        self.controller = ChunkController(target_rate) if adaptive and not auto_wpm else None
+        self.chunk_strategy = chunk_strategy  # As requested (remembered per source by the GUI)
+        if self.controller or auto_wpm:
+            # Plan single graphemes: presses take as many as the controller asks for, and
+            # auto-type's drawn delays fall between individual keystrokes
+            chunk_strategy, chunk_min, chunk_max = "fixed", 1, 1
+        if record_path and seed is None:
+            # A recorded session must be replayable, so its plan needs a known seed
+            seed = random.SystemRandom().randrange(1 << 62)
+        self.chunk_options = (chunk_strategy, chunk_min, chunk_max, seed)
+        self.compile_keys = compile_keys
+        self.verify_on_stop = verify_on_stop
+        # Guards swapping the session/target against a keypress being processed
+        self.swap_lock = threading.Lock()
+        self.session = self._make_session(source_content, keyplan, content_index)
+
+        self.metrics = EngineMetrics()
+        # Optional binary event log for replay (src.recorder)
+        self.recorder = None
+        if record_path:
+            self.recorder = SessionRecorder(record_path, self.chunk_options, self.session.total,
+                                            self.controller.target_rate if self.controller else 0.0)
+        # Optional periodic JSON-lines dump of stats()
+        self.dumper = MetricsDumper(self.stats, metrics_path) if metrics_path else None
+        self.writer = TargetWriter(target_path, fsync_on_stop=fsync_on_stop, on_error=self._on_error,
+                                   latency=self.metrics.write_latency, recorder=self.recorder)
         self.is_recording = False
-        self.kb_controller = keyboard.Controller()
-        self.listener = None
-        self.on_status_change = None # Callback for UI updates
+        self.attached = False
+        self.held_chords = set()  # Chord modifiers currently down (tracked while recording)
+        if inject_mode == "process" and self.service.backend == PYNPUT_BACKEND:
+            # A child process owns the keyboard controller (src.procinject); it types
+            # with pynput, so other backends (e.g. the fake keyboard) stay in-process
+            from src.procinject import ProcessInjector
+            self.injector = ProcessInjector(self._typed, self._chunk_failed, self._on_error,
+                                            queue_size, backpressure)
+        elif inject_mode in ("thread", "process"):
+            self.injector = InjectionWorker(self._type_chars, queue_size, backpressure)
+        else:
+            raise ValueError(f"Unknown injection mode: {inject_mode}")
+        # Auto-type mode: a scheduler thread replaces physical keypresses
+        self.autotyper = None
+        if auto_wpm:
+            schedule = TimingSchedule(auto_wpm, auto_distribution, seed=seed)
+            self.autotyper = AutoTyper(self._inject_chars, schedule)
+        self.accept_keys = False  # Recording and key-driven
+        # Callback for UI updates: on_status_change(status, detail)
+        #   status True/False -> recording toggled, "error" -> detail is a message,
+        #   "progress" -> detail is (content_index, total) after each typed chunk,
+        #   "rate" -> detail is the adaptive controller's state (ChunkController.state())
+        # It runs on engine threads (listener, injector, writer): GUIs should hand
+        # events over, e.g. via src.bridge.EventBridge.post
+        self.on_status_change = None
+
+    def _make_session(self, source_content, keyplan=None, content_index=0):
+        """Build everything a source needs before it goes live"""
+        # Chunk sizes are decided ahead of the position, not per keypress
+        plan = self._plan_from(source_content, content_index)
+        # Key events for every source char, cached on disk per content hash + backend
+        # (callers that already loaded one, e.g. the GUI's source cache, pass it in)
+        if keyplan is None and self.compile_keys:
+            keyplan = load_keyplan(source_content, self.service.backend)
+        if keyplan is not None:
+            keyplan.bind(self.service.keyboard)
+        return TypingSession(source_content, plan, keyplan, content_index)
+
+    def _plan_from(self, source_content, index):
+        """A chunk plan that starts at `index` (snapped back to a grapheme boundary)"""
+        strategy, chunk_min, chunk_max, seed = self.chunk_options
+        return ChunkPlan(source_content, strategy, chunk_min, chunk_max, seed, base=index,
+                         prefetch=True)
+
+    def load(self, source_content, keyplan=None, content_index=0, target_path=None):
+        """
+        Hot-swap the source (and optionally the target) of a running engine.
+        Plans are built first; the swap itself is a single locked assignment.
+        """
+        session = self._make_session(source_content, keyplan, content_index)
+        with self.swap_lock:
+            if target_path is not None:
+                self.writer.set_path(target_path)
+            self.session = session
+            self.writer.begin_segment(content_index)
+            if self.recorder:
+                self.recorder.record(LOAD, content_index, session.total)
+
+    # Session state, kept as attributes for existing callers
+    @property
+    def source_content(self):
+        return self.session.source_content
+
+    @property
+    def plan(self):
+        return self.session.plan
+
+    @property
+    def keyplan(self):
+        return self.session.keyplan
+
+    @property
+    def content_index(self):
+        return self.session.content_index
+
+    @content_index.setter
+    def content_index(self, index):
+        self.session.content_index = index
+
+    @property
+    def target_path(self):
+        return self.writer.path
+
+    @target_path.setter
+    def target_path(self, path):
+        # Flushes to the old file and reopens lazily on the next write
+        with self.swap_lock:
+            self.writer.set_path(path)
+            self.writer.begin_segment(self.session.content_index)
+            self.session.history.clear()  # Earlier chunks are in the old file
+
+    def position(self):
+        """(source content, content_index, length of the next planned chunk), read consistently"""
+        with self.swap_lock:
+            session = self.session
+            index = session.content_index
+            return session.source_content, index, session.plan.length_at(index)
+
+    def seek(self, index):
+        """
+        Move the typing position to the grapheme boundary at or before `index`.
+        Chunking restarts there; the new plan is built before taking the lock.
+        """
+        session = self.session
+        plan = self._plan_from(session.source_content, max(0, min(index, session.total)))
+        with self.swap_lock:
+            if self.session is not session:
+                # The source was swapped meanwhile; plan the new one
+                session = self.session
+                plan = self._plan_from(session.source_content, max(0, min(index, session.total)))
+            session.plan = plan
+            index = plan.base
+            session.content_index = index
+            session.history.clear()
+            self.writer.begin_segment(index)
+            if self.recorder:
+                self.recorder.record(SEEK, index)
+            return index
 
     def start(self):
-        """Start listening for keyboard events"""
-        self.listener = keyboard.Listener(on_press=self._on_press)
-        self.listener.start()
+        """Start receiving keyboard events from the shared service"""
+        self.writer.begin_segment(self.content_index)
+        self.writer.start()
+        self.injector.start()
+        if self.dumper:
+            self.dumper.start()
+        self.service.attach(self)
+        self.attached = True
+
+    def stop(self, drain=True):
+        """Stop receiving events and finish (or discard) pending injections"""
+        self.accept_keys = False
+        if self.autotyper:
+            self.autotyper.stop()
+        if self.attached:
+            self.service.detach(self)
+            self.attached = False
+        self.injector.stop(drain=drain)
+        if self.verify_on_stop and self.writer.path:
+            self._report_check(self.verify())
+        self.writer.close()
+        if self.dumper:
+            self.dumper.stop()
+        if self.recorder:
+            self.recorder.close()
+
+    def verify(self):
+        """
+        Check that the target holds exactly the source text typed into it since the
+        last start/seek/swap (O(1) in the source and target size; see src.verify).
+        """
+        self.writer.flush()
+        return self._check_target(self.writer)
+
+    def _check_target(self, writer):
+        # The index is built once per source, outside the locks (it reads the whole source)
+        session = self.session
+        if session.hashes is None:
+            session.hashes = PrefixHashIndex(session.source_content)
+        with self.swap_lock, writer.lock:
+            session = self.session
+            if session.hashes is None:  # Swapped meanwhile
+                session.hashes = PrefixHashIndex(session.source_content)
+            return check_target(writer.log, session.hashes, writer.path)
 
-    def stop(self):
-        """Stop listening"""
-        if self.listener:
-            self.listener.stop()
+    def _report_check(self, report):
+        if not report["consistent"]:
+            self._notify("error", report["detail"])
+
+    def stats(self):
+        """Snapshot of engine metrics plus progress (safe to call from any thread)"""
+        stats = self.metrics.snapshot()
+        stats.update({
+            "content_index": self.content_index,
+            "total_chars": len(self.source_content) if self.source_content else 0,
+            "queue_depth": self.injector.pending,
+            "write_dropped_chars": self.writer.dropped_chars,
+            "inject_mode": self.injector.mode,
+        })
+        if self.injector.mode == "process":
+            stats["injector_pid"] = self.injector.pid
+            stats["injector_restarts"] = self.injector.restarts
+        if self.autotyper:
+            stats["autotype_jitter"] = self.autotyper.jitter.snapshot()
+        if self.controller:
+            stats["adaptive"] = self.controller.state()
+        return stats
 
     def set_recording(self, state):
         """Set recording state"""
+        # Modifier presses are not tracked while idle, so start from a clean slate
+        self.held_chords.clear()
         self.is_recording = state
+        self.accept_keys = state and self.autotyper is None
+        if self.autotyper:
+            if state:
+                self.autotyper.resume()
+            else:
+                self.autotyper.pause()
+        if not state:
+            self.writer.flush()
+        if self.recorder:
+            self.recorder.record(RECORDING, self.content_index, int(bool(state)))
+        self._notify(state)
+
+    def _notify(self, status, detail=None):
         if self.on_status_change:
-            self.on_status_change(state)
+            self.on_status_change(status, detail)
+        elif status == "error":
+            print(detail)
+
+    def _on_error(self, message):
+        self._notify("error", message)
 
-    def _on_press(self, key):
-        if not self.is_recording:
+    def _on_press(self, key, injected=False):
+        # Runs on the listener thread for every key on the system; keep it cheap
+        if not self.accept_keys:
+            return
+        # Our own synthetic keystrokes must not trigger more typing
+        if injected:
+            return
+        if key in self.modifier_keys:
+            if key in self.chord_keys:
+                self.held_chords.add(key)
             return
-        
-        # Check for modifiers to avoid typing during shortcuts
-        is_modifier = False
-        if hasattr(key, 'name'):
-            if any(mod in key.name for mod in ['ctrl', 'alt', 'shift', 'cmd', 'win']):
-                is_modifier = True
-        
-        if not is_modifier:
-            self._inject_chars()
+        # Ctrl/Alt/Cmd held: this is a shortcut (e.g. Ctrl+C), not typing
+        if self.held_chords:
+            return
+        if key == self.backspace_key:
+            # The key itself already erased one char in the focused app
+            self._rewind(1, erased=1)
+            return
+        if key == self.rewind_key:
+            self._rewind(self.rewind_chunks)
+            return
+        self._inject_chars()
+
+    def _on_release(self, key, injected=False):
+        if self.held_chords and not injected:
+            self.held_chords.discard(key)
 
     def _inject_chars(self):
-        if not self.source_content or self.content_index >= len(self.source_content):
-            return
+        """Queue the next chunk; returns it, "" if refused, None at the end of the source"""
+        with self.swap_lock:
+            session = self.session
+            index = session.content_index
+            if not session.source_content or index >= len(session.source_content):
+                return None
 
-        # Typer logic: 1-5 chars at a time
-        num_chars = random.randint(1, 5)
-        chars_to_add = self.source_content[self.content_index : self.content_index + num_chars]
-        self.content_index += num_chars
-
-        if chars_to_add:
-            # Type in separate thread to not block listener
-            threading.Thread(target=self._type_chars, args=(chars_to_add,), daemon=True).start()
-            
-            # Write to target file if set
-            if self.target_path:
-                try:
-                    with open(self.target_path, 'a', encoding='utf-8') as f:
-                        f.write(chars_to_add)
-                except:
-                    pass
-
-    def _type_chars(self, chars):
+            pressed_at = time.perf_counter()
+            self.metrics.keypresses += 1
+
+            # Typer logic: next planned chunk (1-5 chars by default, never splits a grapheme)
+            num_chars = session.plan.length_at(index)
+            if self.controller:
+                num_chars = self._adaptive_length(session.plan, index, num_chars)
+            chars_to_add = session.source_content[index : index + num_chars]
+
+            if chars_to_add:
+                # Hand off to the injection worker; a refused chunk leaves the index untouched
+                if not self.injector.submit((session, index, chars_to_add, pressed_at)):
+                    self.metrics.dropped += 1
+                    if self.recorder:
+                        self.recorder.record(REFUSED, index, at=pressed_at)
+                    return ""
+                session.content_index = index + len(chars_to_add)
+                entry = TypedChunk(index, len(chars_to_add), pressed_at)
+                session.history.append(entry)
+                if self.recorder:
+                    self.recorder.record(INJECT, index, len(chars_to_add), at=pressed_at)
+                # Buffered append to the target file (no-op if unset)
+                self.writer.write(chars_to_add, entry)
+                return chars_to_add
+            return None
+
+    def _adaptive_length(self, plan, index, num_chars):
+        """Merge planned graphemes up to the controller's size for this press"""
+        controller = self.controller
+        want = controller.next_size(self.injector.pending)
+        graphemes = 1
+        while graphemes < want:
+            step = plan.length_at(index + num_chars)
+            if not step:
+                break
+            num_chars += step
+            graphemes += 1
+        if controller.due_report():
+            self._notify("rate", controller.state())
+        return num_chars
+
+    def _rewind(self, chunks, erased=0):
+        """
+        Step back `chunks` typed chunks: move content_index back, cut them off the
+        target and send one Backspace per char still on screen (`erased` already gone).
+        Chunks whose injection or write failed are only dropped from the history; a
+        chunk still queued is assumed to land.
+        """
+        with self.swap_lock:
+            session = self.session
+            history = session.history
+            if not history:
+                return
+            visible = 0
+            for _ in range(min(chunks, len(history))):
+                entry = history.pop()
+                raw = session.source_content[entry.start:entry.start + entry.length]
+                self.writer.retract(raw, entry)
+                if entry.landed:
+                    # CRLF was typed as a single Enter
+                    visible += entry.length - raw.count('\r\n')
+                session.content_index = entry.start
+            self.metrics.rewinds += 1
+            if self.recorder:
+                self.recorder.record(BACKSPACE if erased else REWIND, session.content_index, chunks)
+            backspaces = visible - erased
+            if backspaces > 0:
+                # Queued behind pending chunks so the erase happens after they are typed
+                if not self.injector.submit((session, session.content_index, backspaces,
+                                             time.perf_counter())):
+                    self.metrics.dropped += 1
+                    self._notify("error", f"Rewind could not send {backspaces} backspaces (queue full)")
+
+    def _type_chars(self, chunk):
+        # The chunk carries its session: it may have been queued before a source swap
+        session, start, chars, pressed_at = chunk
         try:
-            self.kb_controller.type(chars)
+            if isinstance(chars, int):
+                # A rewind: `chars` is the number of backspaces
+                for _ in range(chars):
+                    self.kb_controller.press(self.backspace_key)
+                    self.kb_controller.release(self.backspace_key)
+                chars = ""
+            elif session.keyplan is not None:
+                session.keyplan.play(self.kb_controller, start, chars)
+            else:
+                self.kb_controller.type(chars.replace('\r\n', '\n'))
         except Exception as e:
-            print(f"Simulation Error: {e}")
+            self._chunk_failed(chunk, f"Simulation Error: {e}")
+            return
+        self._typed(chunk, time.perf_counter() - pressed_at)
+
+    def _typed(self, chunk, latency):
+        # Injector thread, or the out-of-process injector's ack thread
+        _, start, chars, _ = chunk
+        typed = 0 if isinstance(chars, int) else len(chars)
+        self.metrics.record_injection(typed, latency)
+        if self.controller:
+            self.controller.record_latency(latency)
+        if self.recorder:
+            self.recorder.record(TYPED, start, typed, latency)
+        self._on_typed(chunk)
+
+    def _chunk_failed(self, chunk, message):
+        session, start, chars, pressed_at = chunk
+        if not isinstance(chars, int):
+            # Never on screen: a later rewind must not send backspaces for it
+            for entry in reversed(list(session.history)):
+                if entry.pressed_at == pressed_at and entry.start == start:
+                    entry.landed = False
+                    break
+        self.metrics.failed += 1
+        if message:
+            self._notify("error", message)
+
+    def _on_typed(self, chunk):
+        session, start, chars, _ = chunk
+        # Rewinds carry a backspace count instead of text
+        typed = 0 if isinstance(chars, int) else len(chars)
+        self._notify("progress", (start + typed, session.total))
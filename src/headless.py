@@ -0,0 +1,157 @@
+"""
+Pasty (페이스티) - Headless Batch Rendering
+
+Renders source -> target transcripts without a keyboard or display: each job
+runs a GhostTyper on a null keyboard backend and drives its normal injection
+path (chunk plan, target writer, verification) as fast as it will go, while a
+TimingSchedule assigns every chunk the time it would have been typed at.
+Jobs are spread over a process pool.
+"""
+
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from src.config import AUTOTYPE_WPM, AUTOTYPE_DISTRIBUTION, CHUNK_STRATEGY, CHUNK_SEED
+from src.autotype import TimingSchedule
+from src.backends import fake_service
+from src.engine import GhostTyper
+from src.source import load_source
+
+CHUNK_LOG_SUFFIX = ".chunks.tsv"
+
+
+class HeadlessJob:
+    """One source -> target transcript, with an optional chunk/timing log"""
+
+    __slots__ = ("source", "target", "log")
+
+    def __init__(self, source, target, log=None):
+        self.source = source
+        self.target = target
+        self.log = log
+
+
+def read_manifest(path, chunk_log=False):
+    """
+    Jobs from a JSON-lines manifest: {"source": ..., "target": ..., "log": ...} per
+    line ("log" optional). Relative paths are relative to the manifest; blank lines
+    and lines starting with # are skipped.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+                source, target = entry["source"], entry["target"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: bad manifest entry ({e})") from None
+            source = os.path.join(base, os.path.expanduser(source))
+            target = os.path.join(base, os.path.expanduser(target))
+            log = entry.get("log")
+            if log:
+                log = os.path.join(base, os.path.expanduser(log))
+            elif chunk_log:
+                log = target + CHUNK_LOG_SUFFIX
+            jobs.append(HeadlessJob(source, target, log))
+    return jobs
+
+
+def render_job(job, wpm=AUTOTYPE_WPM, distribution=AUTOTYPE_DISTRIBUTION,
+               chunk_strategy=CHUNK_STRATEGY, seed=CHUNK_SEED):
+    """
+    Type one job's source into its (truncated) target; returns a result dict.
+    Memory stays bounded by the engine's windows and buffers: the source is
+    memory-mapped when large, and the target and log are streamed.
+    """
+    result = {"source": job.source, "target": job.target, "chars": 0, "chunks": 0,
+              "typing_seconds": 0.0, "seconds": 0.0, "consistent": None, "error": None}
+    started = time.perf_counter()
+    try:
+        content = load_source(job.source)
+        open(job.target, "wb").close()  # Each run renders a fresh transcript
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    # Null backend: keystrokes go nowhere, so only the target file is produced
+    engine = GhostTyper(content, job.target, service=fake_service(record=False), compile_keys=False,
+                        chunk_strategy=chunk_strategy, seed=seed, verify_on_stop=False)
+    errors = []
+
+    def on_status_change(status, detail=None):
+        if status == "error":
+            errors.append(detail)
+
+    engine.on_status_change = on_status_change
+    schedule = TimingSchedule(wpm, distribution, seed=seed)
+    at = 0.0
+    engine.start()
+    try:
+        with open(job.log, "w", encoding="utf-8") if job.log else nullcontext() as log:
+            if log:
+                log.write("offset\tchars\tat_ms\n")
+            while True:
+                index = engine.content_index
+                # The same path a physical keypress takes
+                chunk = engine._inject_chars()
+                if chunk is None:
+                    break
+                if not chunk:
+                    engine.injector.queue.join()  # Queue full: let the worker catch up
+                    continue
+                result["chunks"] += 1
+                if log:
+                    log.write(f"{index}\t{len(chunk)}\t{at * 1000:.1f}\n")
+                at += schedule.delay_after(chunk)
+        report = engine.verify()
+    except OSError as e:
+        errors.append(str(e))
+        report = None
+    finally:
+        engine.stop()
+        close = getattr(content, "close", None)
+        if close:
+            close()
+
+    result["chars"] = engine.content_index
+    result["typing_seconds"] = at
+    result["consistent"] = report["consistent"] if report else False
+    result["error"] = errors[0] if errors else (report["detail"] if report else None)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def run_jobs(jobs, workers=None, **options):
+    """Render jobs on a process pool; yields result dicts as jobs finish"""
+    if workers == 1:
+        for job in jobs:
+            yield render_job(job, **options)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_job, job, **options) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results, wall_seconds):
+    """Aggregate throughput over finished jobs"""
+    done = [r for r in results if not r["error"]]
+    chars = sum(r["chars"] for r in results)
+    return {
+        "jobs": len(results),
+        "failed": len(results) - len(done),  # Includes targets that failed verification
+        "chars": chars,
+        "chunks": sum(r["chunks"] for r in results),
+        "wall_seconds": round(wall_seconds, 3),
+        "chars_per_sec": round(chars / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        "jobs_per_sec": round(len(results) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        # Time the same transcripts would have taken to type at the schedule's pace
+        "typing_hours": round(sum(r["typing_seconds"] for r in results) / 3600, 2),
+    }
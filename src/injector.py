@@ -0,0 +1,83 @@
+"""
+Pasty (페이스티) - Keystroke Injection Worker
+"""
+
+import queue
+import threading
+
+from src.config import INJECT_QUEUE_SIZE, INJECT_BACKPRESSURE, INJECT_BLOCK_TIMEOUT
+
+# Queue marker that tells the worker to exit after everything before it is typed
+_STOP = object()
+
+
+class InjectionWorker:
+    """Single long-lived thread that types queued chunks in strict FIFO order"""
+
+    BACKPRESSURE_MODES = ("block", "reject")
+    mode = "thread"
+
+    def __init__(self, type_func, queue_size=INJECT_QUEUE_SIZE,
+                 backpressure=INJECT_BACKPRESSURE, block_timeout=INJECT_BLOCK_TIMEOUT):
+        if backpressure not in self.BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        self.type_func = type_func
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.rejected = 0
+
+    @property
+    def pending(self):
+        """Number of chunks waiting to be typed"""
+        return self.queue.qsize()
+
+    def start(self):
+        """Start the worker thread (no-op if already running)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name="pasty-injector", daemon=True)
+        self.thread.start()
+
+    def submit(self, chars):
+        """
+        Queue a chunk for typing.
+        Returns False when the queue is full and the backpressure policy refuses it,
+        so the caller can leave its position untouched.
+        """
+        try:
+            if self.backpressure == "block":
+                self.queue.put(chars, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(chars)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        return True
+
+    def stop(self, drain=True, timeout=5.0):
+        """Stop the worker. With drain=True every queued chunk is typed first."""
+        if not self.thread:
+            return
+        if not drain:
+            # Discard whatever has not been typed yet
+            try:
+                while True:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+            except queue.Empty:
+                pass
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        while True:
+            chars = self.queue.get()
+            try:
+                if chars is _STOP:
+                    return
+                self.type_func(chars)
+            finally:
+                self.queue.task_done()
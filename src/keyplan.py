@@ -0,0 +1,239 @@
+"""
+Pasty (페이스티) - Compiled Keystroke Plans
+"""
+
+import os
+import re
+import sys
+import mmap
+import struct
+import hashlib
+import weakref
+from array import array
+
+from src.config import KEYPLAN_CACHE_MAX_BYTES, SOURCE_MMAP_THRESHOLD
+from src.paths import user_cache_dir
+
+# Chars typed as plain key events; everything else goes through unicode injection
+_DIRECT = "\n\r\t" + "".join(chr(c) for c in range(0x20, 0x7F))
+
+FALLBACK = 0xFFFF  # Type this char with controller.type() (unicode injection)
+NOOP = 0xFFFE      # Emit nothing (the CR of a CRLF pair)
+
+_TRANSLATE = {ord(ch): i for i, ch in enumerate(_DIRECT)}
+_NON_DIRECT = re.compile("[^" + re.escape(_DIRECT) + "]")
+_CR_BEFORE_LF = re.compile(r"\r(?=\n)")
+_UTF16 = "utf-16-le" if sys.byteorder == "little" else "utf-16-be"
+
+# Cache file: magic, format version, reserved, event count (16 bytes keeps events aligned)
+_HEADER = struct.Struct("<4sHHQ")
+_MAGIC = b"PKP1"
+_FORMAT_VERSION = 1
+_COMPILE_BLOCK = 1 << 20
+
+
+def _key_table():
+    """(kind, value, shift) for every direct char, in _DIRECT order"""
+    table = []
+    for ch in _DIRECT:
+        if ch in "\r\n":
+            table.append(("key", "enter", False))
+        elif ch == "\t":
+            table.append(("key", "tab", False))
+        elif "A" <= ch <= "Z":
+            table.append(("char", ch.lower(), True))
+        else:
+            table.append(("char", ch, False))
+    return table
+
+
+KEY_TABLE = _key_table()
+
+
+def source_digest(source):
+    """Content hash of a str or memory-mapped source"""
+    h = hashlib.blake2b(digest_size=16)
+    mapped = getattr(source, "map", None)
+    if mapped is not None:
+        h.update(mapped)
+    else:
+        for i in range(0, len(source), _COMPILE_BLOCK):
+            h.update(source[i:i + _COMPILE_BLOCK].encode("utf-8"))
+    return h.hexdigest()
+
+
+def _compile_blocks(source):
+    """Event bytes (native 'H') for the source, one block of chars at a time"""
+    total = len(source)
+    carry = ""
+    for i in range(0, total, _COMPILE_BLOCK):
+        block = carry + source[i:i + _COMPILE_BLOCK]
+        carry = ""
+        if block.endswith("\r") and i + _COMPILE_BLOCK < total:
+            # Keep a trailing CR with the next block so CRLF is seen as a pair
+            carry, block = "\r", block[:-1]
+        # All C-level passes: mark fallbacks, drop CR of CRLF, map direct chars to indices
+        block = _NON_DIRECT.sub("\uffff", block)
+        block = _CR_BEFORE_LF.sub("\ufffe", block)
+        yield block.translate(_TRANSLATE).encode(_UTF16)
+
+
+def compile_plan(source):
+    """Translate the whole source into one event index per char, in memory"""
+    events = array("H")
+    for data in _compile_blocks(source):
+        events.frombytes(data)
+    return KeyPlan(events)
+
+
+def _release(view, mapped):
+    view.release()
+    mapped.close()
+
+
+class KeyPlan:
+    """Per-char keystroke events for a source, replayed without re-translating chars"""
+
+    def __init__(self, events, mapped=None):
+        self.events = events  # array('H') or a memoryview over a cache file
+        self.keys = None
+        self.shift = None
+        # A mapped cache file is unmapped by close(), or as soon as the plan is dropped
+        self._finalizer = weakref.finalize(self, _release, events, mapped) if mapped else None
+
+    def close(self):
+        """Unmap the cache file now (the plan must not be played afterwards)"""
+        if self._finalizer:
+            self._finalizer()
+
+    def __len__(self):
+        return len(self.events)
+
+    def bind(self, keyboard):
+        """Resolve the key table against a pynput-compatible keyboard module once"""
+        keys = []
+        for kind, value, shift in KEY_TABLE:
+            key = getattr(keyboard.Key, value) if kind == "key" else keyboard.KeyCode.from_char(value)
+            keys.append((key, shift))
+        self.keys = keys
+        self.shift = keyboard.Key.shift
+
+    def play(self, controller, start, text):
+        """Type `text`, which sits at char offset `start` of the compiled source"""
+        events = self.events[start:start + len(text)]
+        keys = self.keys
+        run = -1
+        for i, ev in enumerate(events):
+            if ev == FALLBACK:
+                if run < 0:
+                    run = i
+                continue
+            if run >= 0:
+                controller.type(text[run:i])
+                run = -1
+            if ev == NOOP:
+                continue
+            key, shift = keys[ev]
+            if shift:
+                controller.press(self.shift)
+            controller.press(key)
+            controller.release(key)
+            if shift:
+                controller.release(self.shift)
+        if run >= 0:
+            controller.type(text[run:])
+
+
+class KeyPlanCache:
+    """On-disk plans keyed by (content hash, backend), evicted least-recently-used"""
+
+    def __init__(self, directory=None, max_bytes=KEYPLAN_CACHE_MAX_BYTES):
+        self.directory = directory or user_cache_dir() / "keyplans"
+        self.max_bytes = max_bytes
+
+    def path_for(self, digest, backend):
+        return self.directory / f"{digest}-{backend}.kp"
+
+    def load(self, digest, backend, length):
+        """Memory-map a cached plan, or None if missing, stale or corrupt"""
+        path = self.path_for(digest, backend)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        magic, version, count = None, 0, 0
+        if len(mapped) >= _HEADER.size:
+            magic, version, _, count = _HEADER.unpack_from(mapped)
+        if (magic != _MAGIC or version != _FORMAT_VERSION or count != length
+                or len(mapped) != _HEADER.size + count * 2):
+            mapped.close()
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        return KeyPlan(memoryview(mapped)[_HEADER.size:].cast("H"), mapped)
+
+    def build(self, digest, backend, source):
+        """
+        Compile `source` block by block straight into the cache (atomically), trim the
+        cache to max_bytes and return the mapped plan; None if it could not be written.
+        """
+        import tempfile  # Only needed on a cache miss
+
+        path = self.path_for(digest, backend)
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(source)))
+                for data in _compile_blocks(source):
+                    f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            # The cache is only an accelerator; a read-only home just means recompiling
+            if tmp:
+                self._remove(tmp)
+            return None
+        self.evict(keep=path)
+        return self.load(digest, backend, len(source))
+
+    def evict(self, keep=None):
+        """Delete least-recently-used plans until the directory fits max_bytes"""
+        try:
+            entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*.kp")]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_keyplan(source, backend, cache=None):
+    """Cached plan for `source` on `backend`, compiling (and caching) it on a miss"""
+    if not source:
+        return None
+    cache = cache or KeyPlanCache()
+    digest = source_digest(source)
+    plan = cache.load(digest, backend, len(source))
+    if plan is None:
+        plan = cache.build(digest, backend, source)
+    if plan is None and len(source) < SOURCE_MMAP_THRESHOLD:
+        # No cache: an in-memory plan (2 bytes per char) is only worth it for small sources;
+        # large ones are typed without a plan rather than held in RAM twice over
+        plan = compile_plan(source)
+    return plan
@@ -0,0 +1,156 @@
+"""
+Pasty (페이스티) - Runtime Metrics
+"""
+
+import json
+import time
+import threading
+from array import array
+from bisect import bisect_right
+
+from src.config import METRICS_DUMP_INTERVAL, METRICS_RATE_WINDOW
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. record() only bumps preallocated counters,
+    so it is safe on hot paths. Each histogram expects a single recording thread.
+    """
+
+    # Upper bucket bounds in seconds; the last bucket catches everything slower
+    BOUNDS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+              0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self):
+        self.counts = array('Q', [0]) * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_right(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound (seconds) of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.BOUNDS[i] if i < len(self.BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Summary in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p90_ms": round(self.percentile(0.9) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": list(self.counts),
+        }
+
+
+class RateMeter:
+    """Per-second counter ring; rate() averages the last complete seconds"""
+
+    def __init__(self, window=METRICS_RATE_WINDOW):
+        self.window = window
+        self.slots = array('Q', [0]) * window
+        self.seconds = array('q', [-1]) * window
+        self.total = 0
+
+    def add(self, n, now=None):
+        sec = int(time.monotonic() if now is None else now)
+        i = sec % self.window
+        if self.seconds[i] != sec:
+            self.seconds[i] = sec
+            self.slots[i] = 0
+        self.slots[i] += n
+        self.total += n
+
+    def rate(self, now=None):
+        sec = int(time.monotonic() if now is None else now)
+        span = self.window - 1  # The current second is still filling up
+        return sum(n for s, n in zip(self.seconds, self.slots) if sec - span <= s < sec) / span
+
+
+class EngineMetrics:
+    """Counters and histograms filled in by GhostTyper's listener, injector and writer"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.inject_latency = LatencyHistogram()  # keypress -> injection complete
+        self.write_latency = LatencyHistogram()   # target file flush
+        self.chars = RateMeter()
+        self.chunks = RateMeter()
+        self.keypresses = 0
+        self.dropped = 0  # chunks refused by injector backpressure
+        self.failed = 0   # chunks whose injection raised
+        self.rewinds = 0  # Backspace / rewind-key presses that undid chunks
+
+    def record_injection(self, chars, latency):
+        now = time.monotonic()
+        self.inject_latency.record(latency)
+        self.chars.add(chars, now)
+        self.chunks.add(1, now)
+
+    def snapshot(self):
+        now = time.monotonic()
+        return {
+            "uptime_s": round(now - self.started, 3),
+            "keypresses": self.keypresses,
+            "chars_total": self.chars.total,
+            "chunks_total": self.chunks.total,
+            "chars_per_sec": round(self.chars.rate(now), 2),
+            "chunks_per_sec": round(self.chunks.rate(now), 2),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "rewinds": self.rewinds,
+            "inject_latency": self.inject_latency.snapshot(),
+            "write_latency": self.write_latency.snapshot(),
+        }
+
+
+class MetricsDumper:
+    """Appends stats_func() as one JSON line to `path` every `interval` seconds"""
+
+    def __init__(self, stats_func, path, interval=METRICS_DUMP_INTERVAL):
+        self.stats_func = stats_func
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="pasty-metrics", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the thread after writing one final line"""
+        if not self.thread:
+            return
+        self.stopped.set()
+        self.thread.join(self.interval + 1.0)
+        self.thread = None
+
+    def _run(self):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                while True:
+                    stopping = self.stopped.wait(self.interval)
+                    f.write(json.dumps({"ts": time.time(), **self.stats_func()}) + "\n")
+                    f.flush()
+                    if stopping:
+                        return
+        except OSError as e:
+            print(f"Metrics dump failed ({self.path}): {e}")
@@ -0,0 +1,39 @@
+"""
+Pasty (페이스티) - Per-user Directories
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from src.config import APP_NAME
+
+
+def user_cache_dir():
+    """Platform cache directory for Pasty (not created)"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / APP_NAME / "Cache"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / APP_NAME
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / APP_NAME.lower()
+
+
+def user_config_dir():
+    """Platform config directory for Pasty (not created)"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming"
+        return Path(base) / APP_NAME
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Application Support" / APP_NAME
+    base = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(base) / APP_NAME.lower()
+
+
+def user_runtime_dir():
+    """Per-user directory for sockets and other runtime files (not created)"""
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base and sys.platform not in ("win32", "darwin"):
+        return Path(base) / APP_NAME.lower()
+    return user_cache_dir()
@@ -0,0 +1,137 @@
+"""
+Pasty (페이스티) - Source Preview Model
+"""
+
+from array import array
+from bisect import bisect_right
+
+from src.config import PREVIEW_CONTEXT_ROWS, PREVIEW_MAX_LINE, PREVIEW_SCAN_CHARS
+
+# Segment kinds, in source order around the typing position
+TYPED = "typed"
+NEXT = "next"
+UPCOMING = "upcoming"
+
+
+class LineIndex:
+    """
+    Start offsets of the source's lines, built incrementally: each extend() scans
+    at most `step` more chars, so indexing a huge source is spread over many
+    frames instead of stalling one. Only used for line numbers; the preview
+    itself never waits for it.
+    """
+
+    def __init__(self, source, step=PREVIEW_SCAN_CHARS):
+        self.source = source
+        self.step = step
+        self.starts = array('Q', [0])
+        self.scanned = 0  # Chars indexed so far
+
+    @property
+    def complete(self):
+        return self.scanned >= len(self.source)
+
+    def extend(self):
+        """Index the next `step` chars; returns False once the whole source is indexed"""
+        total = len(self.source)
+        if self.scanned >= total:
+            return False
+        start = self.scanned
+        block = self.source[start:min(total, start + self.step)]
+        find = block.find
+        pos = find("\n")
+        while pos >= 0:
+            self.starts.append(start + pos + 1)
+            pos = find("\n", pos + 1)
+        self.scanned = start + len(block)
+        return self.scanned < total
+
+    def line_at(self, offset):
+        """0-based line containing `offset`, or None if not indexed that far yet"""
+        if offset > self.scanned:
+            return None
+        return bisect_right(self.starts, offset) - 1
+
+
+class PreviewModel:
+    """
+    The rows of source text visible around the typing position.
+
+    Every lookup is bounded by `max_line` chars (longer lines are wrapped there),
+    so building a frame or scrolling one row costs the same at any file size.
+    The view follows the engine unless scroll() has pinned it elsewhere.
+    """
+
+    def __init__(self, source, context_rows=PREVIEW_CONTEXT_ROWS, max_line=PREVIEW_MAX_LINE):
+        self.source = source
+        self.context_rows = context_rows
+        self.max_line = max_line
+        self.lines = LineIndex(source)
+        self.anchor = None  # Offset of the pinned top row; None follows the engine
+
+    def row_start(self, pos):
+        """Start of the row containing `pos`"""
+        # Long lines wrap on a fixed max_line grid, so rows are the same whichever
+        # direction they are reached from
+        wrap = pos - pos % self.max_line
+        lo = max(0, pos - self.max_line)
+        cut = self.source[lo:pos].rfind("\n")
+        return max(wrap, lo + cut + 1) if cut >= 0 else wrap
+
+    def next_row(self, start):
+        """Start of the row after the one beginning at `start` (len(source) at the end)"""
+        end = min(len(self.source), start - start % self.max_line + self.max_line)
+        cut = self.source[start:end].find("\n")
+        return start + cut + 1 if cut >= 0 else end
+
+    def prev_row(self, start):
+        """Start of the row before the one beginning at `start`"""
+        return self.row_start(start - 1) if start > 0 else 0
+
+    def scroll(self, rows, index):
+        """Pin the view `rows` rows down (negative: up) from where it is now"""
+        top = self.top(index)
+        for _ in range(abs(rows)):
+            top = self.prev_row(top) if rows < 0 else self.next_row(top)
+        total = len(self.source)
+        self.anchor = min(top, self.row_start(total - 1) if total else 0)
+
+    def follow(self):
+        """Let the view track the typing position again"""
+        self.anchor = None
+
+    def top(self, index):
+        """Offset of the first visible row"""
+        if self.anchor is not None:
+            return self.anchor
+        top = self.row_start(index)
+        for _ in range(self.context_rows):
+            top = self.prev_row(top)
+        return top
+
+    def rows(self, index, chunk_len, count):
+        """
+        Up to `count` visible rows as (line number or None, [(text, kind), ...]),
+        where kind is TYPED (before `index`), NEXT (the next `chunk_len` chars) or UPCOMING.
+        """
+        total = len(self.source)
+        start = self.top(index)
+        rows = []
+        for _ in range(count):
+            if start >= total:
+                break
+            end = self.next_row(start)
+            rows.append((self.lines.line_at(start), self._segments(start, end, index, chunk_len)))
+            start = end
+        return rows
+
+    def _segments(self, start, end, index, chunk_len):
+        text = self.source[start:end].rstrip("\r\n")
+        end = start + len(text)
+        segments = []
+        for kind, lo, hi in ((TYPED, start, index), (NEXT, index, index + chunk_len),
+                             (UPCOMING, index + chunk_len, end)):
+            lo, hi = max(lo, start), min(hi, end)
+            if lo < hi:
+                segments.append((text[lo - start:hi - start], kind))
+        return segments
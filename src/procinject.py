@@ -0,0 +1,385 @@
+"""
+Pasty (페이스티) - Out-of-process Keystroke Injection
+
+A child process owns the keyboard controller, so typing never waits on the GIL
+of the process running the UI, the key listener and file I/O. Chunks reach it
+through a shared-memory ring of fixed-size slots:
+
+    header  magic, version, reserved, slot count, slot size, head, acked, skip_to
+    slot    seq (Q), count (I), nbytes (I), kind (B), status (B), done_ns (Q), payload
+
+The parent fills slot `seq % slots` and moves `head`; the child marks it as
+typing, types it, sets status/done_ns and moves `acked`. A slot is reused only
+after the parent has collected its ack. The ring outlives the child: a restarted
+child resumes at acked + 1, so nothing queued is lost or typed twice. A chunk the
+crash cut off mid-way is not typed again (part of it may already be on screen);
+it is reported failed and the new child starts after it.
+"""
+
+import time
+import struct
+import threading
+import multiprocessing
+from array import array
+from collections import deque
+from multiprocessing import shared_memory
+
+from src.config import (INJECT_QUEUE_SIZE, INJECT_BACKPRESSURE, INJECT_BLOCK_TIMEOUT,
+                        PROC_INJECT_SLOT_BYTES, PROC_INJECT_POLL_S, PROC_INJECT_MAX_RESTARTS)
+from src.injector import InjectionWorker
+from src.keyplan import KeyPlan
+
+_HEADER = struct.Struct("<4sHHIIQQQ")
+_MAGIC = b"PIR1"
+_FORMAT_VERSION = 1
+_U64 = struct.Struct("<Q")
+_HEAD = 16     # Last seq published (parent)
+_ACKED = 24    # Last seq typed, failed or skipped (child)
+_SKIP_TO = 32  # Seqs up to this are acked without typing (stop without drain)
+_SLOTS_AT = 64
+_SLOT = struct.Struct("<QIIBB6xQ")
+_STATUS_AT = 17  # Offset of the status byte in a slot
+
+# Slot kinds
+_TEXT = 1       # UTF-8 text for controller.type()
+_PLAN = 2       # `count` keystroke plan events (array 'H'), then the same chars as UTF-8
+_BACKSPACE = 3  # `count` backspaces
+_STOP = 4       # Exit once everything before it is done
+
+# Slot status, set by the child
+_PENDING = 0
+_TYPED = 1
+_FAILED = 2     # Payload replaced by the error message
+_SKIPPED = 3
+_TYPING = 4     # Started; still set if the child died mid-slot
+
+
+def pynput_keyboard():
+    """Keyboard module for the child (imported there: pynput opens the display)"""
+    from pynput import keyboard
+    return keyboard
+
+
+def _type_slot(controller, keyboard, plan, kind, count, payload):
+    if kind == _BACKSPACE:
+        for _ in range(count):
+            controller.press(keyboard.Key.backspace)
+            controller.release(keyboard.Key.backspace)
+    elif kind == _PLAN:
+        events = array("H")
+        events.frombytes(payload[:2 * count])
+        plan.events = events
+        plan.play(controller, 0, payload[2 * count:].decode("utf-8"))
+    else:
+        controller.type(payload.decode("utf-8"))
+
+
+def _child_main(name, items, acks, keyboard_factory):
+    """Injector process: type slots in seq order, acking each one"""
+    shm = shared_memory.SharedMemory(name=name)
+    buf = shm.buf
+    try:
+        _, _, _, slots, slot_bytes, _, acked, _ = _HEADER.unpack_from(buf)
+        payload_bytes = slot_bytes - _SLOT.size
+        keyboard = keyboard_factory()
+        controller = keyboard.Controller()
+        plan = KeyPlan(None)
+        plan.bind(keyboard)
+        parent = multiprocessing.parent_process()
+        seq = acked + 1
+        while True:
+            if not items.acquire(timeout=PROC_INJECT_POLL_S):
+                if parent is not None and not parent.is_alive():
+                    return  # Orphaned
+                continue
+            offset = _SLOTS_AT + (seq % slots) * slot_bytes
+            _, count, nbytes, kind, _, _ = _SLOT.unpack_from(buf, offset)
+            start = offset + _SLOT.size
+            status = _TYPED
+            if kind == _STOP:
+                pass
+            elif seq <= _U64.unpack_from(buf, _SKIP_TO)[0]:
+                status = _SKIPPED
+            else:
+                buf[offset + _STATUS_AT] = _TYPING
+                try:
+                    _type_slot(controller, keyboard, plan, kind, count, bytes(buf[start:start + nbytes]))
+                except Exception as e:
+                    status = _FAILED
+                    message = f"Simulation Error: {e}".encode("utf-8")[:payload_bytes]
+                    buf[start:start + len(message)] = message
+                    nbytes = len(message)
+            _SLOT.pack_into(buf, offset, seq, count, nbytes, kind, status, time.perf_counter_ns())
+            _U64.pack_into(buf, _ACKED, seq)
+            acks.release()
+            if kind == _STOP:
+                return
+            seq += 1
+    finally:
+        del buf
+        shm.close()
+
+
+class ProcessInjector:
+    """
+    InjectionWorker replacement that types in a supervised child process.
+
+    submit() takes the engine's (session, start, chars, pressed_at) chunks and
+    copies them into the ring; an ack thread calls on_typed(chunk, latency) or
+    on_failed(chunk, message) for each, in order. A child that dies is restarted
+    (up to `max_restarts` times per start()) and picks up where the ring says it
+    stopped, after failing the chunk it was typing; on_error(message) reports it.
+    """
+
+    mode = "process"
+
+    def __init__(self, on_typed, on_failed, on_error, queue_size=INJECT_QUEUE_SIZE,
+                 backpressure=INJECT_BACKPRESSURE, block_timeout=INJECT_BLOCK_TIMEOUT,
+                 slot_bytes=PROC_INJECT_SLOT_BYTES, max_restarts=PROC_INJECT_MAX_RESTARTS,
+                 keyboard_factory=pynput_keyboard):
+        if backpressure not in InjectionWorker.BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode: {backpressure}")
+        self.on_typed = on_typed
+        self.on_failed = on_failed
+        self.on_error = on_error
+        self.slots = queue_size
+        self.slot_bytes = slot_bytes
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.max_restarts = max_restarts
+        self.keyboard_factory = keyboard_factory  # Called in the child; must be picklable
+        # spawn: forking a process that runs Qt/pynput threads is unsafe
+        self.context = multiprocessing.get_context("spawn")
+
+        self.lock = threading.Lock()  # Publishing, collecting and (re)spawning
+        self.space = threading.Condition(self.lock)  # Notified when slots are freed
+        self.shm = None
+        self.process = None
+        self.items = None  # Semaphore: slots published, not yet taken by the child
+        self.acks = None   # Semaphore: wakes the ack thread
+        self.collector = None
+        self.head = 0      # Last seq published
+        self.released = 0  # Last seq whose ack was collected (its slot is free again)
+        self.inflight = deque()  # Chunk per unreleased seq (None for all but a chunk's last slot)
+        self.running = False
+        self.stopping = False
+        self.broken = False  # Gave up restarting
+        self.rejected = 0
+        self.restarts = 0
+
+    @property
+    def pending(self):
+        """Number of slots waiting to be typed"""
+        return self.head - self.released
+
+    @property
+    def pid(self):
+        process = self.process
+        return process.pid if process else None
+
+    def start(self):
+        """Create the ring and the child process (no-op if already running)"""
+        with self.lock:
+            if self.running:
+                return
+            self.shm = shared_memory.SharedMemory(create=True,
+                                                  size=_SLOTS_AT + self.slots * self.slot_bytes)
+            _HEADER.pack_into(self.shm.buf, 0, _MAGIC, _FORMAT_VERSION, 0, self.slots,
+                              self.slot_bytes, 0, 0, 0)
+            self.head = self.released = 0
+            self.inflight.clear()
+            self.running = True
+            self.stopping = self.broken = False
+            self.restarts = 0
+            self._spawn()
+        self.collector = threading.Thread(target=self._collect_loop, name="pasty-injector-acks",
+                                          daemon=True)
+        self.collector.start()
+
+    def submit(self, chunk):
+        """
+        Copy a chunk into the ring.
+        Returns False when the ring is full and the backpressure policy refuses it
+        (or the child could not be kept alive), so the caller can leave its position untouched.
+        """
+        records = self._encode(chunk)
+        with self.lock:
+            deadline = None
+            while self.running and not self.broken and \
+                    self.head + len(records) - self.released > self.slots:
+                if self.backpressure == "reject":
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.block_timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.space.wait(remaining)
+            if not self.running or self.broken or \
+                    self.head + len(records) - self.released > self.slots:
+                self.rejected += 1
+                return False
+            self._publish(records, chunk)
+        return True
+
+    def stop(self, drain=True, timeout=5.0):
+        """Stop the child. With drain=True every queued chunk is typed first."""
+        with self.lock:
+            if not self.running:
+                return
+            self.stopping = True
+            if not drain:
+                _U64.pack_into(self.shm.buf, _SKIP_TO, self.head)
+            deadline = time.monotonic() + timeout
+            while self.released < self.head and not self.broken:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.space.wait(remaining)
+            if not self.broken and self.head - self.released < self.slots:
+                self._publish([(_STOP, 0, b"")], None)
+            self.running = False
+            process = self.process
+        self.collector.join(timeout)
+        self.collector = None
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        self._collect()  # The stop slot's ack
+        self.process = self.items = self.acks = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    # --- Parent side ---
+
+    def _encode(self, chunk):
+        """Slot records (kind, count, payload) for a chunk, split to fit the slots"""
+        session, start, chars, _ = chunk
+        if isinstance(chars, int):
+            return [(_BACKSPACE, chars, b"")]
+        payload_bytes = self.slot_bytes - _SLOT.size
+        keyplan = session.keyplan
+        if keyplan is not None:
+            # Ship the compiled events so the child replays them without re-translating
+            step = payload_bytes // 6  # 2 bytes per event + up to 4 of UTF-8 per char
+            records = []
+            for lo in range(0, len(chars), step):
+                text = chars[lo:lo + step]
+                events = bytes(keyplan.events[start + lo:start + lo + len(text)])
+                records.append((_PLAN, len(text), events + text.encode("utf-8")))
+            return records
+        text = chars.replace('\r\n', '\n')
+        step = payload_bytes // 4
+        return [(_TEXT, len(text[lo:lo + step]), text[lo:lo + step].encode("utf-8"))
+                for lo in range(0, len(text), step)]
+
+    def _publish(self, records, chunk):
+        # Caller holds self.lock and has checked there is room
+        buf = self.shm.buf
+        last = len(records) - 1
+        for i, (kind, count, data) in enumerate(records):
+            seq = self.head + 1
+            offset = _SLOTS_AT + (seq % self.slots) * self.slot_bytes
+            start = offset + _SLOT.size
+            buf[start:start + len(data)] = data
+            # The slot header goes last: the child checks it only after `items` says it is ready
+            _SLOT.pack_into(buf, offset, seq, count, len(data), kind, _PENDING, 0)
+            _U64.pack_into(buf, _HEAD, seq)
+            self.head = seq
+            self.inflight.append(chunk if i == last else None)
+            self.items.release()
+
+    def _spawn(self):
+        # Caller holds self.lock. Fresh semaphores: a dead child may have left them in any state
+        acked = _U64.unpack_from(self.shm.buf, _ACKED)[0]
+        self.items = self.context.Semaphore(self.head - acked)
+        self.acks = self.context.Semaphore(0)
+        self.process = self.context.Process(
+            target=_child_main, name="pasty-injector",
+            args=(self.shm.name, self.items, self.acks, self.keyboard_factory), daemon=True)
+        self.process.start()
+
+    def _fail_interrupted(self):
+        # Caller holds self.lock; the child is dead. Fail the chunk it was typing
+        # (every slot up to the chunk's last) so the next child starts after it.
+        buf = self.shm.buf
+        seq = _U64.unpack_from(buf, _ACKED)[0] + 1
+        if seq > self.head or buf[_SLOTS_AT + (seq % self.slots) * self.slot_bytes + _STATUS_AT] != _TYPING:
+            return
+        message = b"Injector process exited while typing this chunk; part of it may be on screen"
+        last = seq
+        while self.inflight[last - self.released - 1] is None:
+            last += 1
+        for k in range(seq, last + 1):
+            offset = _SLOTS_AT + (k % self.slots) * self.slot_bytes
+            _, count, nbytes, kind, _, _ = _SLOT.unpack_from(buf, offset)
+            if k == seq:
+                data = message[:self.slot_bytes - _SLOT.size]
+                buf[offset + _SLOT.size:offset + _SLOT.size + len(data)] = data
+                nbytes = len(data)
+            _SLOT.pack_into(buf, offset, k, count, nbytes, kind, _FAILED, time.perf_counter_ns())
+        _U64.pack_into(buf, _ACKED, last)
+
+    def _collect(self):
+        """Hand out results for every slot the child has acked since the last call"""
+        finished = []
+        with self.lock:
+            if self.shm is None:
+                return
+            buf = self.shm.buf
+            acked = _U64.unpack_from(buf, _ACKED)[0]
+            if acked == self.released:
+                return
+            message = None
+            while self.released < acked:
+                seq = self.released + 1
+                offset = _SLOTS_AT + (seq % self.slots) * self.slot_bytes
+                _, _, nbytes, _, status, done_ns = _SLOT.unpack_from(buf, offset)
+                if status == _FAILED and message is None:
+                    start = offset + _SLOT.size
+                    message = bytes(buf[start:start + nbytes]).decode("utf-8", "replace")
+                chunk = self.inflight.popleft()
+                self.released = seq
+                if chunk is not None:
+                    if status != _SKIPPED:
+                        finished.append((chunk, done_ns, message))
+                    message = None
+            self.space.notify_all()
+        for chunk, done_ns, message in finished:
+            if message is not None:
+                self.on_failed(chunk, message)
+            else:
+                # perf_counter is the system-wide monotonic clock, so the child's
+                # completion time is comparable with the parent's press time
+                self.on_typed(chunk, max(0.0, done_ns / 1e9 - chunk[3]))
+
+    def _collect_loop(self):
+        while True:
+            self.acks.acquire(timeout=PROC_INJECT_POLL_S)
+            self._collect()
+            abandoned = []
+            with self.lock:
+                if not self.running:
+                    return
+                if self.broken or self.process.is_alive():
+                    continue
+                exitcode = self.process.exitcode
+                self.restarts += 1
+                if self.restarts <= self.max_restarts:
+                    self._fail_interrupted()
+                    self._spawn()
+                    kept = self.head - _U64.unpack_from(self.shm.buf, _ACKED)[0]
+                    error = f"Injector process exited ({exitcode}); restarted, {kept} queued slots kept"
+                else:
+                    # Nothing will type the queued chunks: count them as failed
+                    self.broken = True
+                    abandoned = [chunk for chunk in self.inflight if chunk is not None]
+                    self.inflight.clear()
+                    self.released = self.head
+                    self.space.notify_all()
+                    error = f"Injector process keeps exiting ({exitcode}); typing stopped"
+            self.on_error(error)
+            for chunk in abandoned:
+                self.on_failed(chunk, None)
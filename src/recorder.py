@@ -0,0 +1,302 @@
+"""
+Pasty (페이스티) - Session Recording & Replay
+
+A recording is a fixed header followed by fixed-size little-endian records:
+    t_ns (Q)  content_index (Q)  length (I)  latency s (f)  event (B)  padding
+t_ns counts from when the recorder was created. Replay feeds the recorded
+presses, rewinds, seeks and recording toggles back through a GhostTyper on the
+fake keyboard backend and checks that it queues the same chunks.
+
+    python -m src.recorder dump LOG
+    python -m src.recorder replay LOG SOURCE [--speed X] [--record OUT]
+"""
+
+import sys
+import time
+import queue
+import struct
+import argparse
+import threading
+
+from src.config import RECORDER_BUFFER_RECORDS
+
+# Header: magic, format version, record size, source chars, chunk seed (-1: none),
+# chunk min/max (max 0: default), adaptive target rate (0: off), reserved, strategy
+_HEADER = struct.Struct("<4sHHQqIIfI16s")
+_MAGIC = b"PRC1"
+_FORMAT_VERSION = 1
+_RECORD = struct.Struct("<QQIfB7x")
+
+# Event types
+INJECT = 1     # A press queued a chunk (index, length); timestamped at the press
+REFUSED = 2    # A press found the injection queue full (index)
+TYPED = 3      # The injector typed a chunk (index, length, latency); length 0 for backspaces
+WRITE = 4      # The target writer flushed (source offset written up to, bytes, latency)
+BACKSPACE = 5  # Physical Backspace undid a chunk (index after)
+REWIND = 6     # Rewind key undid `length` chunks (index after)
+RECORDING = 7  # Recording toggled (length 1 = on, 0 = off)
+SEEK = 8       # Position moved (index)
+LOAD = 9       # Source swapped (index, length = new source chars)
+
+EVENT_NAMES = {INJECT: "inject", REFUSED: "refused", TYPED: "typed", WRITE: "write",
+               BACKSPACE: "backspace", REWIND: "rewind", RECORDING: "recording",
+               SEEK: "seek", LOAD: "load"}
+
+
+class SessionRecorder:
+    """
+    Appends event records to a binary log. record() packs into a preallocated
+    buffer under a short lock; full buffers are handed to a writer thread, so the
+    hot path never touches the disk.
+    """
+
+    def __init__(self, path, chunk_options, total, target_rate=0.0,
+                 buffer_records=RECORDER_BUFFER_RECORDS):
+        strategy, chunk_min, chunk_max, seed = chunk_options
+        self.path = path
+        self.capacity = buffer_records
+        self.buffer = bytearray(_RECORD.size * buffer_records)
+        self.count = 0
+        self.records = 0
+        self.lock = threading.Lock()
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, _RECORD.size, total,
+                                     -1 if seed is None else seed, chunk_min, chunk_max or 0,
+                                     target_rate, 0, strategy.encode("ascii")))
+        self.pending = queue.Queue()  # Filled buffers (bytes) for the writer thread; None stops it
+        self.thread = threading.Thread(target=self._write_loop, name="pasty-recorder", daemon=True)
+        self.thread.start()
+        self.t0 = time.perf_counter()
+
+    def record(self, event, index, length=0, latency=0.0, at=None):
+        """Append one event (`at`: its perf_counter time, default now)"""
+        t = (time.perf_counter() if at is None else at) - self.t0
+        with self.lock:
+            _RECORD.pack_into(self.buffer, self.count * _RECORD.size,
+                              max(0, int(t * 1e9)), index, length, latency, event)
+            self.count += 1
+            if self.count == self.capacity:
+                self.pending.put(bytes(self.buffer))
+                self.records += self.count
+                self.count = 0
+
+    def _hand_off(self):
+        # Caller holds self.lock
+        if self.count:
+            self.pending.put(bytes(self.buffer[:self.count * _RECORD.size]))
+            self.records += self.count
+            self.count = 0
+
+    def _write_loop(self):
+        while True:
+            data = self.pending.get()
+            try:
+                if data is None:
+                    return
+                self.file.write(data)
+                self.file.flush()
+            except OSError as e:
+                print(f"Session recording failed ({self.path}): {e}")
+            finally:
+                self.pending.task_done()
+
+    def flush(self):
+        """Write out every event recorded so far"""
+        with self.lock:
+            self._hand_off()
+        self.pending.join()
+
+    def close(self):
+        with self.lock:
+            self._hand_off()
+        self.pending.put(None)
+        self.thread.join()
+        self.file.close()
+
+
+def read_log(path):
+    """(header dict, records as (t_ns, index, length, latency, event) tuples)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Not a Pasty session recording: {path}")
+    magic, version, size, total, seed, chunk_min, chunk_max, target_rate, _, strategy = \
+        _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _FORMAT_VERSION or size != _RECORD.size:
+        raise ValueError(f"Not a Pasty session recording (or an unsupported version): {path}")
+    header = {
+        "total": total,
+        "seed": None if seed < 0 else seed,
+        "chunk_min": chunk_min,
+        "chunk_max": chunk_max or None,
+        "target_rate": target_rate,
+        "strategy": strategy.rstrip(b"\0").decode("ascii"),
+    }
+    body = memoryview(data)[_HEADER.size:]
+    # A crash can leave a partial last record; ignore it
+    body = body[:len(body) - len(body) % _RECORD.size]
+    return header, list(_RECORD.iter_unpack(body))
+
+
+class _Capture:
+    """Recorder stand-in for replay: keeps the queued chunks, forwards to a real recorder"""
+
+    def __init__(self, inner=None):
+        self.inner = inner
+        self.injected = []
+
+    def record(self, event, index, length=0, latency=0.0, at=None):
+        if event == INJECT:
+            self.injected.append((index, length))
+        if self.inner:
+            self.inner.record(event, index, length, latency, at)
+
+    def close(self):
+        if self.inner:
+            self.inner.close()
+
+
+def replay(path, source, speed=None, record_path=None):
+    """
+    Feed a recording back through a GhostTyper on the fake keyboard backend.
+
+    speed=None replays in lockstep, as fast as possible: each press waits for the
+    previous chunk to be typed, so the run is deterministic and presses the
+    original session had refused are skipped. speed=X keeps the recorded gaps
+    between events, X times faster, to reproduce queueing and timing behaviour.
+    Returns a report comparing the chunks queued with the recorded ones.
+    """
+    from src.backends import fake_service, Key, KeyCode
+    from src.engine import GhostTyper
+
+    header, records = read_log(path)
+    if len(source) != header["total"]:
+        raise ValueError(f"Source has {len(source)} chars, the recording {header['total']}")
+    adaptive = header["target_rate"] > 0
+    if adaptive and speed is None:
+        raise ValueError("Adaptive sessions depend on key timing; replay them with a speed")
+
+    service = fake_service()
+    keyboard = service.keyboard
+    engine = GhostTyper(source, None, service=service, compile_keys=False,
+                        chunk_strategy=header["strategy"], chunk_min=header["chunk_min"],
+                        chunk_max=header["chunk_max"], seed=header["seed"], verify_on_stop=False,
+                        adaptive=adaptive, target_rate=header["target_rate"] or 1.0)
+    capture = engine.recorder = _Capture()
+    if record_path:
+        capture.inner = SessionRecorder(record_path, engine.chunk_options, engine.session.total,
+                                        header["target_rate"])
+    expected = [(index, length) for _, index, length, _, event in records if event == INJECT]
+    press = KeyCode.from_char("a")
+    lockstep = speed is None
+    swapped = False
+
+    engine.start()
+    started = time.perf_counter()
+    first = records[0][0] if records else 0
+    try:
+        for t_ns, index, length, _, event in records:
+            if not lockstep:
+                delay = started + (t_ns - first) / 1e9 / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if event == INJECT or (event == REFUSED and not lockstep):
+                if engine.accept_keys:
+                    keyboard.press(press)
+                else:
+                    engine._inject_chars()  # Auto-type mode: no key involved
+            elif event == BACKSPACE:
+                keyboard.press(Key.backspace)
+            elif event == REWIND:
+                engine._rewind(length)
+            elif event == RECORDING:
+                engine.set_recording(bool(length))
+            elif event == SEEK:
+                engine.seek(index)
+            elif event == LOAD:
+                swapped = True  # The new source was not recorded; stop here
+                break
+            else:
+                continue
+            if lockstep:
+                engine.injector.queue.join()
+    finally:
+        engine.stop()
+    elapsed = time.perf_counter() - started
+
+    got = capture.injected
+    mismatch = next((i for i, pair in enumerate(zip(expected, got)) if pair[0] != pair[1]), None)
+    if mismatch is None and len(expected) != len(got) and not swapped:
+        mismatch = min(len(expected), len(got))
+    span = (records[-1][0] - first) / 1e9 if records else 0.0
+    return {
+        "events": len(records),
+        "recorded_chunks": len(expected),
+        "replayed_chunks": len(got),
+        "matches": mismatch is None,
+        "first_mismatch": mismatch,  # Chunk number where the replay diverged
+        "source_swapped": swapped,
+        "recorded_seconds": round(span, 3),
+        "replay_seconds": round(elapsed, 3),
+        "speedup": round(span / elapsed, 1) if elapsed > 0 else None,
+        "typed_chars": len(keyboard.text),
+    }
+
+
+def summarize(records):
+    """Event counts and latency percentiles of a recording"""
+    counts = {}
+    latencies = {TYPED: [], WRITE: []}
+    for _, _, _, latency, event in records:
+        counts[EVENT_NAMES.get(event, str(event))] = counts.get(EVENT_NAMES.get(event, str(event)), 0) + 1
+        if event in latencies:
+            latencies[event].append(latency)
+
+    def percentiles(values):
+        if not values:
+            return None
+        values.sort()
+        pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 3)
+        return {"p50_ms": pick(0.5), "p99_ms": pick(0.99), "max_ms": round(values[-1] * 1000, 3)}
+
+    span = (records[-1][0] - records[0][0]) / 1e9 if records else 0.0
+    return {"events": len(records), "seconds": round(span, 3), "counts": counts,
+            "inject_latency": percentiles(latencies[TYPED]),
+            "write_latency": percentiles(latencies[WRITE])}
+
+
+def main(argv=None):
+    import json
+    from src.source import load_source
+
+    parser = argparse.ArgumentParser(prog="python -m src.recorder",
+                                     description="Inspect or replay a Pasty session recording")
+    commands = parser.add_subparsers(dest="command", required=True)
+    dump = commands.add_parser("dump", help="Print a recording's header and summary")
+    dump.add_argument("log")
+    dump.add_argument("--events", type=int, default=0, metavar="N", help="Also print the first N events")
+    run = commands.add_parser("replay", help="Replay a recording against its source")
+    run.add_argument("log")
+    run.add_argument("source")
+    run.add_argument("--speed", type=float, help="Keep recorded timing, X times faster (default: lockstep)")
+    run.add_argument("--record", metavar="OUT", help="Record the replay itself to OUT")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "dump":
+            header, records = read_log(args.log)
+            print(json.dumps({"header": header, **summarize(records)}, indent=2))
+            for t_ns, index, length, latency, event in records[:args.events]:
+                print(f"{t_ns / 1e6:12.3f} ms  {EVENT_NAMES.get(event, event):<9} "
+                      f"index={index} length={length} latency={latency * 1000:.3f} ms")
+            return 0
+        report = replay(args.log, load_source(args.source), args.speed, args.record)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0 if report["matches"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
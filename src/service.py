@@ -0,0 +1,114 @@
+"""
+Pasty (페이스티) - Shared Keyboard Service & Typing Sessions
+"""
+
+import sys
+import threading
+from collections import deque
+
+from src.config import REWIND_HISTORY
+
+# Keystroke plans are cached per backend
+PYNPUT_BACKEND = f"pynput-{sys.platform}-{sys.byteorder}"
+
+
+def _keys(keyboard, *names):
+    """Key members by name, skipping ones this backend lacks"""
+    return frozenset(getattr(keyboard.Key, n) for n in names if hasattr(keyboard.Key, n))
+
+
+class KeyboardService:
+    """
+    Process-wide keyboard hook and controller.
+
+    The listener is started once, on the first attach(), and stays up: engines attach
+    and detach (or swap sources) without re-hooking the keyboard. `keyboard` is any
+    module-like object with pynput.keyboard's Controller, Listener, Key and KeyCode.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, keyboard, backend):
+        self.keyboard = keyboard
+        self.backend = backend
+        self.controller = keyboard.Controller()
+        # Held down -> the next key is part of a shortcut, never inject
+        self.chord_keys = _keys(keyboard, 'ctrl', 'ctrl_l', 'ctrl_r', 'alt', 'alt_l', 'alt_r',
+                                'alt_gr', 'cmd', 'cmd_l', 'cmd_r')
+        # Never inject on these themselves
+        self.modifier_keys = self.chord_keys | _keys(keyboard, 'shift', 'shift_l', 'shift_r')
+        self.handlers = ()  # Replaced, never mutated, so the listener can iterate lock-free
+        self.listener = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """The pynput-backed service (importing pynput opens the display, so this is lazy)"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from pynput import keyboard
+                cls._shared = cls(keyboard, PYNPUT_BACKEND)
+            return cls._shared
+
+    def attach(self, handler):
+        """Route key events to handler._on_press/_on_release, hooking the keyboard if needed"""
+        with self.lock:
+            if handler not in self.handlers:
+                self.handlers = self.handlers + (handler,)
+            if self.listener is None:
+                self.listener = self.keyboard.Listener(on_press=self._on_press,
+                                                       on_release=self._on_release)
+                self.listener.start()
+
+    def detach(self, handler):
+        """Stop routing events to handler; the hook itself stays installed"""
+        with self.lock:
+            self.handlers = tuple(h for h in self.handlers if h is not handler)
+
+    def shutdown(self):
+        """Remove the keyboard hook"""
+        with self.lock:
+            self.handlers = ()
+            if self.listener:
+                self.listener.stop()
+                self.listener = None
+
+    def _on_press(self, key, injected=False):
+        for handler in self.handlers:
+            handler._on_press(key, injected)
+
+    def _on_release(self, key, injected=False):
+        for handler in self.handlers:
+            handler._on_release(key, injected)
+
+
+class TypedChunk:
+    """A chunk in the rewind history, and whether it reached the screen and the target"""
+
+    __slots__ = ("start", "length", "pressed_at", "landed", "written")
+
+    def __init__(self, start, length, pressed_at):
+        self.start = start
+        self.length = length
+        self.pressed_at = pressed_at  # Identifies the queued chunk
+        self.landed = True   # False once its injection failed
+        self.written = True  # False once the flush carrying it failed
+
+
+class TypingSession:
+    """One source being typed: its content, chunk plan, keystroke plan and position"""
+
+    __slots__ = ("source_content", "plan", "keyplan", "content_index", "hashes", "history")
+
+    def __init__(self, source_content, plan, keyplan=None, content_index=0):
+        self.source_content = source_content
+        self.plan = plan
+        self.keyplan = keyplan
+        self.content_index = content_index
+        self.hashes = None  # PrefixHashIndex, built on the first target check
+        self.history = deque(maxlen=REWIND_HISTORY)  # TypedChunk per queued chunk
+
+    @property
+    def total(self):
+        return len(self.source_content) if self.source_content else 0
@@ -0,0 +1,180 @@
+"""
+Pasty (페이스티) - Settings Store
+"""
+
+import os
+import json
+import threading
+import time
+from pathlib import Path
+
+from src.config import (CHUNK_STRATEGY, SETTINGS_FILE, SETTINGS_SAVE_DELAY_MS,
+                        SETTINGS_RECENT_SOURCES)
+from src.paths import user_config_dir
+
+DEFAULTS = {
+    "theme": "system",
+    "language": "ko",
+    "auto_wpm": None,               # Words per minute for hands-free auto-type; null = type on keypress
+    "adaptive_rate": None,          # Chars/sec for adaptive chunking (like --rate); null = planned chunks
+    "chunk_strategy": CHUNK_STRATEGY,
+    "recent_sources": {},           # Source path -> where it was left (see remember_source)
+}
+
+
+def default_settings_path():
+    return user_config_dir() / SETTINGS_FILE
+
+
+class SettingsStore:
+    """
+    settings.json in the per-user config directory.
+
+    load() is a plain blocking read, meant for a worker thread. Changes are made
+    in memory and written by a background thread once they have been quiet for
+    `save_delay_ms`, atomically (temp file + rename), so a crash mid-write leaves
+    the previous file intact. flush() writes pending changes immediately.
+    """
+
+    def __init__(self, path=None, save_delay_ms=SETTINGS_SAVE_DELAY_MS,
+                 max_recent=SETTINGS_RECENT_SOURCES):
+        self.path = Path(path or default_settings_path())
+        self.save_delay = save_delay_ms / 1000.0
+        self.max_recent = max_recent
+        self.data = json.loads(json.dumps(DEFAULTS))  # Deep copy
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.write_lock = threading.Lock()  # One writer at a time (saver thread or flush)
+        self.dirty = False
+        self.changed_at = 0.0
+        self.saver = None
+        self.running = False
+
+    # --- Loading ---
+
+    def load(self):
+        """Read the settings file (or a legacy ./settings.json); returns a copy of the settings"""
+        loaded = None
+        for path in (self.path, Path("settings.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                print(f"Failed to load settings ({path}): {e}")
+            break
+        with self.lock:
+            if isinstance(loaded, dict):
+                for key, value in loaded.items():
+                    if key in DEFAULTS:
+                        self.data[key] = value
+                if not isinstance(self.data["recent_sources"], dict):
+                    self.data["recent_sources"] = {}
+                if path != self.path:
+                    self._mark_dirty()  # Migrate the legacy file
+            return json.loads(json.dumps(self.data))
+
+    # --- Access ---
+
+    def get(self, key):
+        with self.lock:
+            return self.data.get(key, DEFAULTS.get(key))
+
+    def update(self, **values):
+        """Set top-level settings and schedule a save"""
+        with self.lock:
+            self.data.update(values)
+            self._mark_dirty()
+
+    def recent_source(self, key):
+        """
+        What was remembered for a source, by its SourceCache key (path, mtime_ns, size),
+        or None. Entries for a file that has changed since are ignored.
+        """
+        path, mtime_ns, size = key
+        with self.lock:
+            entry = self.data["recent_sources"].get(path)
+            if not entry or entry.get("mtime_ns") != mtime_ns or entry.get("size") != size:
+                return None
+            return dict(entry)
+
+    def remember_source(self, key, content_index, chunk_strategy, target):
+        """Record where a source was left; the most recent SETTINGS_RECENT_SOURCES are kept"""
+        path, mtime_ns, size = key
+        with self.lock:
+            recent = self.data["recent_sources"]
+            recent.pop(path, None)  # Re-insert so dict order is least- to most-recent
+            recent[path] = {"mtime_ns": mtime_ns, "size": size, "content_index": content_index,
+                            "chunk_strategy": chunk_strategy, "target": target or ""}
+            for old in list(recent)[:max(0, len(recent) - self.max_recent)]:
+                del recent[old]
+            self._mark_dirty()
+
+    # --- Saving ---
+
+    def _mark_dirty(self):
+        # Caller holds self.lock
+        self.dirty = True
+        self.changed_at = time.monotonic()
+        if not self.running:
+            self.running = True
+            self.saver = threading.Thread(target=self._save_loop, name="pasty-settings", daemon=True)
+            self.saver.start()
+        self.wake.notify()
+
+    def _save_loop(self):
+        with self.lock:
+            while self.running:
+                if not self.dirty:
+                    self.wake.wait()
+                    continue
+                remaining = self.changed_at + self.save_delay - time.monotonic()
+                if remaining > 0:
+                    self.wake.wait(remaining)
+                    continue
+                self.lock.release()
+                try:
+                    self.flush()
+                finally:
+                    self.lock.acquire()
+
+    def flush(self):
+        """Write pending changes now (no-op if there are none)"""
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                text = json.dumps(self.data, indent=2, ensure_ascii=False)
+                self.dirty = False
+            self._write(text)
+
+    def _write(self, text):
+        import tempfile
+
+        tmp = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".settings-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Failed to save settings: {e}")
+            if tmp:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    def close(self):
+        """Stop the saver thread and write anything pending"""
+        with self.lock:
+            self.running = False
+            self.wake.notify()
+        if self.saver:
+            self.saver.join(1.0)
+            self.saver = None
+        self.flush()
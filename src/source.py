@@ -0,0 +1,166 @@
+"""
+Pasty (페이스티) - Source Text Loading
+"""
+
+import os
+import mmap
+import codecs
+import threading
+from array import array
+from collections import OrderedDict
+
+from src.config import (SOURCE_MMAP_THRESHOLD, SOURCE_INDEX_STRIDE, SOURCE_WINDOW_CHARS,
+                        SOURCE_CACHE_SIZE)
+
+# Bytes decoded per step while building the offset index
+_SCAN_BLOCK = 1 << 20
+
+
+def load_source(path, threshold=SOURCE_MMAP_THRESHOLD):
+    """Open a source file: small files as a plain str, large ones memory-mapped"""
+    if os.path.getsize(path) < threshold:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    return MappedSource(path)
+
+
+class MappedSource:
+    """
+    Read-only UTF-8 text backed by mmap, sliced like a str.
+
+    Only a small decoded window is kept in memory. A sparse index stores the byte
+    offset of every `stride`-th character, so jumping to any character offset costs
+    at most one stride of decoding regardless of file size.
+    Line endings are kept exactly as stored (no universal-newline translation).
+    """
+
+    def __init__(self, path, stride=SOURCE_INDEX_STRIDE, window_size=SOURCE_WINDOW_CHARS):
+        self.path = path
+        self.stride = stride
+        self.window_size = window_size
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            # offsets[k] = byte offset of character k * stride
+            self.offsets = array('Q')
+            self.length = self._build_index()
+        except Exception:
+            self.close()
+            raise
+        # (start char, decoded text) swapped as one tuple so readers on other threads
+        # never pair a new start with old text
+        self.window = (0, "")
+
+    def _build_index(self):
+        """Scan the file once (strict UTF-8) and record sparse char->byte offsets"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        size = len(self.map)
+        chars = 0     # chars decoded before the current block's text
+        byte_pos = 0  # byte offset of character `chars`
+        next_mark = 0
+        for start in range(0, size, _SCAN_BLOCK):
+            end = start + _SCAN_BLOCK
+            text = decoder.decode(self.map[start:end], final=end >= size)
+            seg = 0
+            while next_mark - chars <= len(text):
+                k = next_mark - chars
+                byte_pos += len(text[seg:k].encode('utf-8'))
+                seg = k
+                self.offsets.append(byte_pos)
+                next_mark += self.stride
+            byte_pos += len(text[seg:].encode('utf-8'))
+            chars += len(text)
+        if not self.offsets:
+            self.offsets.append(0)
+        return chars
+
+    def _decode(self, start, count):
+        """Decode `count` chars beginning at char offset `start`"""
+        mark = start // self.stride
+        skip = start - mark * self.stride
+        byte = self.offsets[mark]
+        need = skip + count
+        # At most 4 bytes per char; a trailing partial sequence is held back by the decoder
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        text = decoder.decode(self.map[byte:byte + need * 4])
+        return text[skip:need]
+
+    def __len__(self):
+        return self.length
+
+    def __bool__(self):
+        return self.length > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError("MappedSource only supports contiguous slices")
+            if stop <= start:
+                return ""
+            window_start, window = self.window
+            if start >= window_start and stop <= window_start + len(window):
+                return window[start - window_start:stop - window_start]
+            if stop - start > self.window_size:
+                # Larger than the window: decode directly, leave the window alone
+                return self._decode(start, stop - start)
+            # Slide the window forward so sequential reads stay in memory
+            window = self._decode(start, self.window_size)
+            self.window = (start, window)
+            return window[:stop - start]
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError("source index out of range")
+        return self[key:key + 1]
+
+    def __str__(self):
+        return self[0:self.length]
+
+    def close(self):
+        """Release the mapping and file handle"""
+        if getattr(self, 'map', None) is not None:
+            self.map.close()
+            self.map = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SourceCache:
+    """
+    Small thread-safe LRU of loaded sources keyed by (path, mtime, size), so
+    switching back to a recently used, unchanged file skips reading it again.
+    """
+
+    def __init__(self, capacity=SOURCE_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key_for(path):
+        """Cache key for the file as it is on disk right now"""
+        st = os.stat(path)
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                # Evicted mapped sources close when the last engine using them goes away
+                self.entries.popitem(last=False)
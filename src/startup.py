@@ -0,0 +1,104 @@
+"""
+Pasty (페이스티) - Startup Profiling & Import-time Budget
+"""
+
+import os
+import sys
+import time
+import builtins
+import argparse
+import subprocess
+
+from src.config import IMPORT_BUDGET_MS
+
+
+class StartupProfiler:
+    """
+    Records import times (by wrapping __import__) and named init phases.
+    Does nothing unless enabled, so entry points can create one unconditionally.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []   # (label, seconds since previous mark)
+        self.imports = []  # (depth, name, cumulative seconds), in completion order
+        self.last = self.started
+        self.depth = 0
+        self.original_import = None
+        if enabled:
+            self._hook_imports()
+
+    def _hook_imports(self):
+        original = self.original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            self.depth += 1
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self.depth -= 1
+                self.imports.append((self.depth, name, time.perf_counter() - start))
+
+        builtins.__import__ = timed_import
+
+    def mark(self, label):
+        """End the current init phase"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((label, now - self.last))
+        self.last = now
+
+    def report(self, top=12):
+        """Stop hooking imports and return the breakdown as text lines"""
+        if not self.enabled:
+            return []
+        if self.original_import:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+        lines = [f"Startup profile ({(self.last - self.started) * 1000:.1f} ms to last mark)"]
+        lines.append("  Phases:")
+        for label, seconds in self.phases:
+            lines.append(f"    {seconds * 1000:8.1f} ms  {label}")
+        # Top-level imports only; nested ones are included in their parent's time
+        outer = sorted((t, n) for d, n, t in self.imports if d == 0)[::-1][:top]
+        lines.append("  Slowest imports (cumulative):")
+        for seconds, name in outer:
+            lines.append(f"    {seconds * 1000:8.1f} ms  {name}")
+        return lines
+
+
+def measure_import(module, runs=3):
+    """Best-of-`runs` cold import time of `module` in a fresh interpreter, in ms"""
+    code = ("import time; t = time.perf_counter(); "
+            f"import {module}; print((time.perf_counter() - t) * 1000)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, check=True,
+                             capture_output=True, text=True)
+        ms = float(out.stdout.strip().splitlines()[-1])
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def check_budget(budgets=IMPORT_BUDGET_MS, runs=3):
+    """Print import times against their budgets; True if all are within budget"""
+    ok = True
+    for module, budget in budgets.items():
+        ms = measure_import(module, runs)
+        within = ms <= budget
+        ok = ok and within
+        print(f"{'OK  ' if within else 'SLOW'} {module:<12} {ms:8.1f} ms  (budget {budget} ms)")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pasty import-time budget check")
+    parser.add_argument("--runs", type=int, default=3, help="Cold imports per module (best is kept)")
+    args = parser.parse_args()
+    sys.exit(0 if check_budget(runs=args.runs) else 1)
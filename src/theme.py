@@ -0,0 +1,195 @@
+"""
+Pasty (페이스티) - Themes & Stylesheets
+"""
+
+import threading
+from functools import lru_cache
+
+from src.config import THEME_MODES
+
+# Palettes: gradients are stop colors, top to bottom
+THEMES = {
+    "light": {
+        "window": "#f5f5f5",
+        "text": "#333333",
+        "secondary": "#666666",
+        "rec": "#f44336",
+        "input": ("#ffffff", "#f0f0f0"),
+        "input_text": "#333333",
+        "input_border": "#ccc",
+        "input_border_bottom": "#bbb",
+        "button": ("#eefeff", "#d0f0ff", "#b0dfff"),
+        "button_hover": ("#ffffff", "#e0f5ff", "#cceeff"),
+        "button_pressed": ("#b0dfff", "#d0f0ff"),
+        "button_text": "#004488",
+        "button_border": "#88ccee",
+        "start": ("#8accff", "#59aaff", "#4090ee"),
+        "start_hover": ("#a0d8ff", "#70b8ff", "#50a0ff"),
+        "start_pressed": ("#4090ee", "#59aaff"),
+        "start_text": "white",
+        "start_border": "#3070cc",
+        "disabled": "#f0f0f0",
+        "disabled_text": "#aaa",
+        "disabled_border": "#ccc",
+        "preview": "#ffffff",
+        "preview_border": "#ccc",
+        "highlight": "#59aaff",
+        "highlight_text": "white",
+    },
+    "dark": {
+        "window": "#1a1a1a",
+        "text": "#ffffff",
+        "secondary": "#999999",
+        "rec": "#f44336",
+        "input": ("#333333", "#2a2a2a"),
+        "input_text": "#e0e0e0",
+        "input_border": "#555",
+        "input_border_bottom": "#555",
+        "button": ("#4a90e2", "#357abd", "#2a68a8"),
+        "button_hover": ("#5ca0f2", "#4a90e2", "#357abd"),
+        "button_pressed": ("#2a68a8", "#357abd"),
+        "button_text": "white",
+        "button_border": "#1a4b78",
+        "start": ("#4a90e2", "#357abd", "#2a68a8"),
+        "start_hover": ("#5ca0f2", "#4a90e2", "#357abd"),
+        "start_pressed": ("#2a68a8", "#357abd"),
+        "start_text": "white",
+        "start_border": "#1a4b78",
+        "disabled": "#2a2a2a",
+        "disabled_text": "#555",
+        "disabled_border": "#444",
+        "preview": "#222222",
+        "preview_border": "#444",
+        "highlight": "#357abd",
+        "highlight_text": "white",
+    },
+}
+
+# One sheet for the whole app; widgets are matched by objectName, so a theme
+# change is a single setStyleSheet call and nothing is rebuilt
+_TEMPLATE = """
+QMainWindow#pasty {{ background-color: {window}; }}
+QWidget#central {{ background: transparent; }}
+QLabel#title {{ font-size: 24px; font-weight: 600; color: {text}; margin: 10px; }}
+QLabel#subtitle {{ font-size: 12px; color: {secondary}; margin-bottom: 15px; }}
+QLabel#source_label, QLabel#target_label {{ font-size: 11px; color: {text}; margin-top: 5px; }}
+QLabel#target_label {{ margin-top: 10px; }}
+QLabel#copyright {{ font-size: 9px; color: {secondary}; margin-top: 10px; }}
+QLabel#rec {{ font-size: 14px; font-weight: bold; color: transparent; margin: 10px; }}
+QLabel#rec[recording="true"] {{ color: {rec}; }}
+QLineEdit#path {{
+    background: {input};
+    color: {input_text};
+    border: 1px solid {input_border};
+    border-bottom: 1px solid {input_border_bottom};
+    border-radius: 5px;
+    padding: 8px;
+    font-size: 11px;
+}}
+QWidget#preview {{
+    background: {preview};
+    color: {text};
+    selection-background-color: {highlight};
+    selection-color: {highlight_text};
+    border: 1px solid {preview_border};
+    border-radius: 5px;
+    font-family: 'Consolas', 'Menlo', monospace;
+    font-size: 11px;
+}}
+QPushButton#browse {{
+    background: {button};
+    color: {button_text};
+    border: 1px solid {button_border};
+    border-radius: 5px;
+    padding: 8px 16px;
+    font-family: 'Segoe UI', sans-serif;
+    font-size: 11px;
+    font-weight: bold;
+}}
+QPushButton#browse:hover {{ background: {button_hover}; }}
+QPushButton#browse:pressed {{ background: {button_pressed}; padding-top: 9px; padding-left: 17px; }}
+QPushButton#start {{
+    background: {start};
+    color: {start_text};
+    border: 1px solid {start_border};
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: bold;
+}}
+QPushButton#start:hover {{ background: {start_hover}; }}
+QPushButton#start:pressed {{ background: {start_pressed}; padding-top: 2px; padding-left: 2px; }}
+QPushButton#start:disabled {{
+    background: {disabled};
+    color: {disabled_text};
+    border: 1px solid {disabled_border};
+}}
+"""
+
+
+def _gradient(stops):
+    """Vertical qlineargradient through evenly spaced stops"""
+    last = len(stops) - 1
+    spec = ", ".join(f"stop:{i / last:g} {color}" for i, color in enumerate(stops))
+    return f"qlineargradient(x1:0, y1:0, x2:0, y2:1, {spec})"
+
+
+@lru_cache(maxsize=None)
+def stylesheet(name):
+    """The compiled application stylesheet for a resolved theme ("light"/"dark")"""
+    palette = {key: _gradient(value) if isinstance(value, tuple) else value
+               for key, value in THEMES[name].items()}
+    return _TEMPLATE.format_map(palette)
+
+
+def system_theme():
+    """The OS theme, "dark" or "light" (light if darkdetect is unavailable)"""
+    try:
+        import darkdetect
+    except ImportError:
+        return "light"
+    return "dark" if darkdetect.isDark() else "light"
+
+
+def resolve_theme(mode):
+    """Map a theme mode ("system", "light", "dark") to a theme name"""
+    if mode not in THEME_MODES:
+        mode = THEME_MODES[0]
+    return system_theme() if mode == "system" else mode
+
+
+def next_mode(mode):
+    """The mode after `mode` in THEME_MODES order"""
+    modes = THEME_MODES
+    return modes[(modes.index(mode) + 1) % len(modes)] if mode in modes else modes[0]
+
+
+class SystemThemeWatcher:
+    """
+    Calls `on_change("light" | "dark")` from a background thread whenever the OS
+    theme changes. darkdetect's listener blocks forever, so the thread is a daemon;
+    start() returns False where darkdetect or its listener is unavailable.
+    """
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.thread = None
+
+    def start(self):
+        if self.thread:
+            return True
+        try:
+            import darkdetect
+        except ImportError:
+            return False
+        if not hasattr(darkdetect, "listener"):
+            return False
+        self.thread = threading.Thread(target=self._run, args=(darkdetect,),
+                                       name="pasty-theme", daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self, darkdetect):
+        try:
+            darkdetect.listener(lambda value: self.on_change("dark" if value == "Dark" else "light"))
+        except (NotImplementedError, OSError):
+            pass  # No change notifications on this platform/desktop
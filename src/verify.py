@@ -0,0 +1,122 @@
+"""
+Pasty (페이스티) - Target Verification (rolling prefix hashes)
+"""
+
+from array import array
+
+from src.config import VERIFY_INDEX_STRIDE, VERIFY_TAIL_BYTES
+
+# Polynomial hash over UTF-8 bytes: h(s) = s read as a base-256 integer mod P.
+# int.from_bytes does the per-byte work in C, and h(a + b) = h(a) * 256^len(b) + h(b).
+P = (1 << 61) - 1
+
+
+def _concat(h, data):
+    return (h * pow(256, len(data), P) + int.from_bytes(data, "big")) % P
+
+
+class PrefixHashIndex:
+    """
+    Hashes of the source prefixes ending every `stride` chars, so the hash of any
+    char range is O(stride) to compute: two checkpoint lookups, two short tails.
+    Ranges are hashed as the raw source (line endings not normalised).
+    """
+
+    def __init__(self, source, stride=VERIFY_INDEX_STRIDE):
+        self.source = source
+        self.stride = stride
+        self.hashes = array('Q', [0])   # hash of source[:k * stride]
+        self.lengths = array('Q', [0])  # UTF-8 length of source[:k * stride]
+        h = length = 0
+        total = len(source)
+        for start in range(0, total - total % stride, stride):
+            block = source[start:start + stride].encode("utf-8")
+            h = _concat(h, block)
+            length += len(block)
+            self.hashes.append(h)
+            self.lengths.append(length)
+
+    def prefix(self, n):
+        """(hash, UTF-8 length) of source[:n]"""
+        k = n // self.stride
+        tail = self.source[k * self.stride:n].encode("utf-8")
+        return _concat(self.hashes[k], tail), self.lengths[k] + len(tail)
+
+    def range_hash(self, start, end):
+        """Hash of source[start:end]"""
+        h_start, len_start = self.prefix(start)
+        h_end, len_end = self.prefix(end)
+        return (h_end - h_start * pow(256, len_end - len_start, P)) % P
+
+
+class WriteLog:
+    """
+    What a TargetWriter has persisted since the current segment began: the hash
+    of the raw source text, its char count, the bytes that reached the file and
+    the last few of them. A segment starts at a known source offset and file size.
+    """
+
+    def __init__(self, tail_bytes=VERIFY_TAIL_BYTES):
+        self.tail_bytes = tail_bytes
+        self.reset(0, 0)
+
+    def reset(self, source_start, base_size):
+        self.source_start = source_start  # Source char offset the segment started at
+        self.base_size = base_size        # Target file size when it started
+        self.hash = 0
+        self.chars = 0
+        self.bytes = 0
+        self.tail = bytearray()
+
+    def record(self, raw, data):
+        """`raw` source text was written to the file as `data` (normalised, encoded)"""
+        # Without a CR the normalised bytes are the raw text's bytes
+        self.hash = _concat(self.hash, raw.encode("utf-8") if "\r" in raw else data)
+        self.chars += len(raw)
+        self.bytes += len(data)
+        self.tail += data
+        if len(self.tail) > self.tail_bytes:
+            del self.tail[:-self.tail_bytes]
+
+    def unrecord(self, raw, data):
+        """Undo record() of the most recent write (the file was truncated by len(data))"""
+        hashed = raw.encode("utf-8") if "\r" in raw else data
+        # P is prime, so 256^len has an inverse: h(a) = (h(a + b) - h(b)) / 256^len(b)
+        self.hash = (self.hash - int.from_bytes(hashed, "big")) * pow(256, -len(hashed), P) % P
+        self.chars -= len(raw)
+        self.bytes -= len(data)
+        # What is left of the tail is still the end of the file, just shorter
+        del self.tail[max(0, len(self.tail) - len(data)):]
+
+
+def check_target(log, index, path):
+    """
+    Compare a WriteLog against the source (via its PrefixHashIndex) and the file.
+    The hash check is O(stride); the file check reads only its size and tail.
+    Returns a report dict; "consistent" is False with a "detail" on the first problem.
+    """
+    end = log.source_start + log.chars
+    report = {"consistent": True, "segment_start": log.source_start, "checked_chars": log.chars,
+              "detail": None}
+    if end > len(index.source) or log.hash != index.range_hash(log.source_start, end):
+        report.update(consistent=False,
+                      detail=f"Target does not match source chars {log.source_start}-{end}")
+        return report
+    if not path:
+        return report
+    expected_size = log.base_size + log.bytes
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, 2)
+            if size != expected_size:
+                report.update(consistent=False,
+                              detail=f"Target size changed: {size} bytes, expected {expected_size}")
+                return report
+            f.seek(size - len(log.tail))
+            tail = f.read(len(log.tail))
+    except OSError as e:
+        report.update(consistent=False, detail=f"Target check failed ({path}): {e}")
+        return report
+    if tail != log.tail:
+        report.update(consistent=False, detail="Target was modified near its end")
+    return report
@@ -0,0 +1,215 @@
+"""
+Pasty (페이스티) - Buffered Target File Writer
+"""
+
+import os
+import time
+import threading
+
+from src.config import WRITER_FLUSH_CHARS, WRITER_FLUSH_INTERVAL_MS, WRITER_FSYNC_ON_STOP
+from src.recorder import WRITE
+from src.verify import WriteLog
+
+
+def _encode(raw):
+    # Memory-mapped sources keep raw line endings; write CRLF as one newline
+    return (raw.replace('\r\n', '\n') if '\r' in raw else raw).encode('utf-8')
+
+
+class TargetWriter:
+    """
+    Keeps the target file open for the whole session and coalesces small writes.
+    Buffered text is flushed every `flush_chars` characters, every `flush_interval_ms`
+    milliseconds, and whenever flush()/close() is called (pause, stop, path change).
+    Text arrives as raw source chunks; CRLF is written as "\n", as UTF-8 bytes.
+    `log` records what reached the file since begin_segment() for verification.
+    """
+
+    def __init__(self, path=None, flush_chars=WRITER_FLUSH_CHARS,
+                 flush_interval_ms=WRITER_FLUSH_INTERVAL_MS, fsync_on_stop=WRITER_FSYNC_ON_STOP,
+                 on_error=None, latency=None, recorder=None):
+        self.path = path or None
+        self.flush_chars = flush_chars
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.fsync_on_stop = fsync_on_stop
+        self.on_error = on_error  # Called with a message string on I/O failure
+        self.latency = latency    # Optional LatencyHistogram for flush timing
+        self.recorder = recorder  # Optional SessionRecorder (WRITE events)
+
+        # Re-entrant so an on_error callback may safely call back into the writer
+        self.lock = threading.RLock()
+        self.wake = threading.Condition(self.lock)
+        self.handle = None
+        self.buffer = []
+        self.entries = []  # History entries (TypedChunk) of the buffered text
+        self.buffered_chars = 0
+        self.dropped_chars = 0
+        self.batch_started = 0.0  # When the oldest buffered text arrived
+        self.log = WriteLog()
+        self.flusher = None
+        self.running = False
+
+    def start(self):
+        """Start the interval flusher thread"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.flusher = threading.Thread(target=self._flush_loop, name="pasty-writer", daemon=True)
+        self.flusher.start()
+
+    def write(self, text, entry=None):
+        """
+        Buffer text for the target file (no-op without a path). `entry.written` is
+        cleared if the flush carrying the text fails.
+        """
+        with self.lock:
+            if not self.path or not text:
+                return
+            was_empty = not self.buffer
+            self.buffer.append(text)
+            if entry is not None:
+                self.entries.append(entry)
+            self.buffered_chars += len(text)
+            if self.buffered_chars >= self.flush_chars:
+                self._flush_locked()
+            elif was_empty:
+                # Let the flusher start timing this batch
+                self.batch_started = time.monotonic()
+                self.wake.notify()
+
+    def flush(self, fsync=False):
+        """Write out everything buffered so far"""
+        with self.lock:
+            self._flush_locked(fsync)
+
+    def begin_segment(self, source_start):
+        """Flush, then log subsequent writes as source text starting at `source_start`"""
+        with self.lock:
+            self._flush_locked()
+            try:
+                base_size = os.path.getsize(self.path) if self.path else 0
+            except OSError:
+                base_size = 0
+            self.log.reset(source_start, base_size)
+
+    def retract(self, raw, entry=None):
+        """
+        Remove `raw`, the text most recently passed to write(), from the end of the
+        target: dropped from the buffer if still there, else the file is truncated
+        to the byte offset the log says it ended at (never re-read or rewritten).
+        Text whose flush failed (`entry.written` cleared) is not in the file; nothing
+        is truncated for it.
+        """
+        with self.lock:
+            if not self.path or not raw:
+                return
+            if self.buffer and self.buffer[-1] == raw:
+                self.buffer.pop()
+                self.buffered_chars -= len(raw)
+                if self.entries and self.entries[-1] is entry:
+                    self.entries.pop()
+                return
+            self._flush_locked()
+            if entry is not None and not entry.written:
+                return
+            data = _encode(raw)
+            size = self.log.base_size + self.log.bytes - len(data)
+            try:
+                if self.handle is None:
+                    self.handle = open(self.path, 'ab')
+                os.ftruncate(self.handle.fileno(), size)
+            except OSError as e:
+                self._report(f"Target truncate failed ({self.path}): {e}")
+                return
+            self.log.unrecord(raw, data)
+
+    def set_path(self, path):
+        """Switch to a new target file; pending text goes to the old one first"""
+        path = path or None
+        with self.lock:
+            if path == self.path:
+                return
+            self._flush_locked()
+            self._close_handle()
+            self.path = path
+
+    def close(self, fsync=None):
+        """Flush, stop the flusher and release the file handle"""
+        if fsync is None:
+            fsync = self.fsync_on_stop
+        with self.lock:
+            self.running = False
+            self.wake.notify()
+            self._flush_locked(fsync)
+            self._close_handle()
+        if self.flusher:
+            self.flusher.join(1.0)
+            self.flusher = None
+
+    def _flush_loop(self):
+        with self.lock:
+            while self.running:
+                if not self.buffer:
+                    self.wake.wait()
+                    continue
+                remaining = self.batch_started + self.flush_interval - time.monotonic()
+                if remaining > 0:
+                    self.wake.wait(remaining)
+                    continue
+                self._flush_locked()
+
+    def _flush_locked(self, fsync=False):
+        if not self.buffer:
+            if fsync and self.handle:
+                self._fsync()
+            return
+        raw = "".join(self.buffer)
+        self.buffer.clear()
+        entries, self.entries = self.entries, []
+        self.buffered_chars = 0
+        data = _encode(raw)
+        started = time.perf_counter()
+        try:
+            if self.handle is None:
+                # Binary: byte offsets in the log must match the file exactly
+                self.handle = open(self.path, 'ab')
+            self.handle.write(data)
+            self.handle.flush()
+            if fsync:
+                os.fsync(self.handle.fileno())
+            self.log.record(raw, data)
+            elapsed = time.perf_counter() - started
+            if self.latency:
+                self.latency.record(elapsed)
+            if self.recorder:
+                log = self.log
+                self.recorder.record(WRITE, log.source_start + log.chars, len(data), elapsed)
+        except OSError as e:
+            self.dropped_chars += len(raw)
+            for entry in entries:
+                entry.written = False
+            self._close_handle()
+            self._report(f"Target write failed ({self.path}): {e}")
+
+    def _fsync(self):
+        try:
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+        except OSError as e:
+            self._report(f"Target fsync failed ({self.path}): {e}")
+
+    def _close_handle(self):
+        if self.handle is None:
+            return
+        try:
+            self.handle.close()
+        except OSError as e:
+            self._report(f"Target close failed ({self.path}): {e}")
+        self.handle = None
+
+    def _report(self, message):
+        if self.on_error:
+            self.on_error(message)
+        else:
+            print(message)